@@ -19,9 +19,46 @@ class Settings(BaseSettings):
     QDRANT_HOST: str
     QDRANT_PORT: int
 
+    # --- [Session Tiering] ---
+    # Redis(hot) 세션 중 유휴 세션은 압축 후 PostgreSQL(cold)로 이관, 재접속 시 Redis로 복원
+    SESSION_HOT_TTL: int = 3600            # Redis 세션 TTL (초). 유휴 기준보다 길어야 이관 전에 만료되지 않음
+    SESSION_IDLE_SECONDS: int = 900        # 마지막 저장 이후 이 시간이 지나면 콜드 저장소로 이관
+    SESSION_FLUSH_INTERVAL: int = 60       # 이관 작업 주기 (초)
+    SESSION_FLUSH_BATCH: int = 500         # 한 번에 이관하는 세션 수
+    SESSION_COLD_MAX_MESSAGES: int = 20    # 콜드 저장 시 남길 최근 메시지 수
+
+    # --- [Knowledge Graph] ---
+    # summarize에서 추출한 (주어, 관계, 대상)을 모아 백그라운드에서 일괄 저장 (neo4j / memory)
+    KNOWLEDGE_BACKEND: str = "neo4j"
+    KNOWLEDGE_FLUSH_BATCH: int = 200       # UNWIND 한 번에 저장하는 사실 수
+    KNOWLEDGE_FLUSH_INTERVAL: float = 2.0  # 저장 주기 (초)
+    KNOWLEDGE_MAX_PENDING: int = 10000     # 백엔드 장애 시 큐 상한 (초과분은 오래된 것부터 폐기)
+    KNOWLEDGE_CACHE_USERS: int = 1000      # 사용자별 인접 리스트 캐시 수 (LRU)
+    KNOWLEDGE_CACHE_TTL: int = 300         # 캐시 갱신 주기 (초, 워커 간 갱신 알림을 놓친 경우 대비)
+    KNOWLEDGE_PROMPT_FACTS: int = 10       # expression 프롬프트에 넣는 사실 수
+
+    # --- [Checkpoint Settings] ---
+    # 활성화 시 워크플로우를 Redis 체크포인터와 함께 컴파일하여
+    # 어느 워커에서든 session_id 기준으로 중단된 턴을 이어서 실행합니다.
+    CHECKPOINT_ENABLED: bool = False
+    CHECKPOINT_TTL_MINUTES: int = 60
+
+    # --- [LoRA Persona Settings] ---
+    LORA_BASE_PATH: str = "/app/loras"     # vLLM 컨테이너 기준 어댑터 경로
+    LORA_WARMUP: bool = True               # 서버 시작 시 모든 페르소나 어댑터 사전 등록/웜업
+    LORA_FALLBACK_TO_BASE: bool = True     # 웜업 전/누락 어댑터는 베이스 모델로 응답
+    LORA_RETRY_SECONDS: int = 30           # 웜업 실패/누락 어댑터 재시도 간격
+    LORA_SCHEDULE_WINDOW_MS: int = 0       # 어댑터별 요청 묶음 윈도우 (0이면 비활성, 켜면 유휴 요청마다 이만큼 지연)
+    LORA_GROUP_MAX_HOLD_MS: int = 200      # 한 어댑터 그룹이 다른 그룹을 막을 수 있는 최대 시간
+
+    # --- [Speculative Expression] ---
+    # 활성화 시 expression 생성을 분석 노드들과 병렬로 미리 시작 (도구 사용 시 취소 후 재생성)
+    SPECULATIVE_EXPRESSION: bool = False
+
     # --- [App Settings] ---
     APP_PORT: int = 8080
     DEBUG: bool = True
+    BATCH_MAX_CONCURRENCY: int = 8   # /chat/batch 전체(모든 배치 요청 합산) 동시 실행 턴 수 (vLLM 처리 용량에 맞춰 조정)
 
     # --- [Sensory - STT Settings] ---
     WHISPER_MODEL_NAME: str = "base"
@@ -33,4 +70,8 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
+    @property
+    def redis_url(self) -> str:
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}"
+
 settings = Settings()
\ No newline at end of file
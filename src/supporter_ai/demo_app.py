@@ -1,11 +1,15 @@
+import json
 import streamlit as st
-import requests
+import httpx
 import asyncio
 import threading
 import numpy as np
 from supporter_ai.sensory.whisper_engine import WhisperEngine
 from supporter_ai.expression.tts_engine import TTSEngine
 
+SERVER_URL = "http://localhost:8080"
+DEFAULT_HISTORY_WINDOW = 30   # 재실행 때마다 다시 그리는 최근 메시지 수
+
 # --- [1. 페이지 및 스타일 설정] ---
 st.set_page_config(page_title="Supporter AI Debug Console", layout="wide")
 
@@ -45,7 +49,40 @@ def get_engines():
     """STT 및 TTS 엔진 로드"""
     return WhisperEngine(), TTSEngine()
 
+class TTSPlayer:
+    """TTS 재생을 전용 스레드의 이벤트 루프에서 실행하여 Streamlit 스크립트가 재생 동안 멈추지 않게 함"""
+    def __init__(self, engine: TTSEngine):
+        self.engine = engine
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.current = None
+
+    def play(self, text: str):
+        self.stop()
+        self.current = asyncio.run_coroutine_threadsafe(self.engine.speak(text), self.loop)
+
+    def stop(self):
+        """재생 중이면 TTSEngine.stop으로 끊고, 음성 합성 중이면 작업 자체를 취소"""
+        if self.current and not self.current.done():
+            self.loop.call_soon_threadsafe(self.engine.stop)
+            self.current.cancel()
+
+@st.cache_resource
+def get_tts_player():
+    return TTSPlayer(get_engines()[1])
+
+@st.cache_resource
+def get_http_client():
+    """재실행 간에 연결을 재사용하는 HTTP 클라이언트 (첫 토큰까지 분석 노드 시간이 걸리므로 read는 넉넉히)"""
+    return httpx.Client(
+        base_url=SERVER_URL,
+        timeout=httpx.Timeout(120.0, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=4)
+    )
+
 stt_engine, tts_engine = get_engines()
+tts_player = get_tts_player()
+http_client = get_http_client()
 
 # 세션 상태 초기화 (AttributeError 방지를 위해 st.session_state 사용)
 if "chat_history" not in st.session_state:
@@ -58,6 +95,8 @@ if "user_id" not in st.session_state:
     st.session_state.user_id = "kwh_01"
 if "session_id" not in st.session_state:
     st.session_state.session_id = "sess_01"
+if "history_window" not in st.session_state:
+    st.session_state.history_window = DEFAULT_HISTORY_WINDOW
 
 # --- [3. 사이드바: 유저/세션 및 기능 제어] ---
 with st.sidebar:
@@ -79,13 +118,22 @@ with st.sidebar:
     search_on = st.toggle("구글 검색 활성화", value=True)
     enabled_tools = ["google_search"] if search_on else []
     
+    st.markdown("---")
+    st.header("🖥️ 표시 설정")
+    st.session_state.history_window = st.slider(
+        "표시할 최근 메시지 수", min_value=10, max_value=200, step=10,
+        value=st.session_state.history_window
+    )
+    if st.button("⏹️ 음성 정지"):
+        tts_player.stop()
+    
     if st.button("🗑️ 대화 초기화"):
         st.session_state.chat_history = []
         st.rerun()
 
 # --- [4. 서버 통신 로직] ---
-def send_to_server(message):
-    """FastAPI 서버에 메시지 전송 및 응답 처리"""
+def send_to_server(message, container):
+    """스트리밍 채팅 엔드포인트로 전송하고 답변 토큰을 받는 대로 화면에 그림"""
     if not message:
         return
 
@@ -97,25 +145,48 @@ def send_to_server(message):
         "blood_type": st.session_state.blood_type,
         "enabled_tools": enabled_tools
     }
+
+    with container:
+        with st.chat_message("user"):
+            st.markdown(message)
+        with st.chat_message("assistant"):
+            placeholder = st.empty()
     
     try:
-        # main.py의 chat 엔드포인트 호출
-        response = requests.post("http://localhost:8080/api/v1/chat", json=payload)
-        
-        if response.status_code == 200:
-            data = response.json()
-            res_body = data["response"]
-            
-            # 히스토리에 사용자 및 AI 메시지 추가
-            st.session_state.chat_history.append({"role": "user", "content": message})
-            st.session_state.chat_history.append({
-                "role": "assistant", 
-                "content": res_body.get("text", ""),
-                "emotion": res_body.get("emotion", {}),
-                "debug_info": data.get("metadata", {})
-            })
-        else:
-            st.error(f"서버 오류: {response.status_code}")
+        text, final = "", None
+        with http_client.stream("POST", "/api/v1/chat/stream", json=payload) as response:
+            if response.status_code != 200:
+                st.error(f"서버 오류: {response.status_code}")
+                return
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["type"] == "token":
+                    text += event["text"]
+                    placeholder.markdown(text + "▌")
+                elif event["type"] == "reset":
+                    text = ""
+                elif event["type"] == "final":
+                    final = event
+                elif event["type"] == "error":
+                    st.error(f"서버 오류: {event.get('detail')}")
+                    return
+
+        if final is None:
+            st.error("서버 응답이 중간에 끊겼습니다.")
+            return
+        res_body = final["response"]
+        placeholder.markdown(res_body.get("text", ""))
+
+        # 히스토리에 사용자 및 AI 메시지 추가
+        st.session_state.chat_history.append({"role": "user", "content": message})
+        st.session_state.chat_history.append({
+            "role": "assistant", 
+            "content": res_body.get("text", ""),
+            "emotion": res_body.get("emotion", {}),
+            "debug_info": final.get("metadata", {})
+        })
     except Exception as e:
         st.error(f"서버 연결 실패: {str(e)}")
 
@@ -124,7 +195,14 @@ st.title(f"🤖 Supporter AI ({st.session_state.blood_type}형 모드)")
 
 chat_container = st.container(height=550)
 with chat_container:
-    for i, chat in enumerate(st.session_state.chat_history):
+    # 긴 히스토리는 최근 메시지만 그려서 재실행 비용을 일정하게 유지
+    history = st.session_state.chat_history
+    start = max(0, len(history) - st.session_state.history_window)
+    if start:
+        st.caption(f"이전 메시지 {start}개 생략 (사이드바에서 표시 개수 조절)")
+
+    for i in range(start, len(history)):
+        chat = history[i]
         with st.chat_message(chat["role"]):
             st.markdown(chat["content"])
             
@@ -133,9 +211,8 @@ with chat_container:
                 col_tts, col_debug = st.columns([1, 5])
                 with col_tts:
                     if st.button("🔊 재생", key=f"tts_{i}"):
-                        with st.spinner("말하는 중..."):
-                            # TTS 엔진을 통한 음성 출력
-                            asyncio.run(tts_engine.speak(chat["content"]))
+                        # 백그라운드 재생 (사이드바의 '음성 정지'로 중단)
+                        tts_player.play(chat["content"])
                 
                 with col_debug:
                     with st.expander("사고 과정 보기"):
@@ -161,5 +238,5 @@ with input_col1:
 with input_col2:
     # 텍스트 입력창 (하단 고정)
     if prompt := st.chat_input("메시지를 입력하세요..."):
-        send_to_server(prompt)
+        send_to_server(prompt, chat_container)
         st.rerun()
\ No newline at end of file
@@ -0,0 +1,59 @@
+# src/supporter_ai/graph/batch.py
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+from supporter_ai.graph.checkpoint import thread_config, run_turn
+
+logger = logging.getLogger(__name__)
+
+async def run_batch(
+    graph,
+    states: List[Dict[str, Any]],
+    capacity: asyncio.Semaphore,
+    max_concurrency: Optional[int] = None,
+    carry_memory: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    여러 (세션, 메시지) 턴을 동시에 실행하고 끝나는 순서대로 결과를 내보냅니다.
+    - 같은 세션의 턴은 입력 순서대로 하나씩 실행 (대화 맥락 보존)
+    - 서로 다른 세션은 병렬 실행 (vLLM 배치 활용). capacity는 앱 전체가 공유하는 동시 실행 한도이고,
+      max_concurrency가 주어지면 이 배치 요청만의 한도를 추가로 적용
+    - carry_memory: 저장 노드가 없는 평가용 그래프에서 이전 턴의 messages/summary를 다음 턴에 이어붙임
+    결과: {"index": 입력 순번, "state": 최종 상태} 또는 {"index": ..., "error": 메시지}
+    """
+    sessions: Dict[str, List[int]] = {}
+    for idx, state in enumerate(states):
+        sessions.setdefault(state.get("session_id", "default"), []).append(idx)
+
+    limit = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run_session(session_id: str, indices: List[int]):
+        memory: Dict[str, Any] = {}
+        for idx in indices:
+            state = {**states[idx], **memory}
+            try:
+                if limit:
+                    await limit.acquire()
+                try:
+                    async with capacity:
+                        final_state = await run_turn(graph, state, thread_config(session_id))
+                finally:
+                    if limit:
+                        limit.release()
+                if carry_memory:
+                    memory = {"messages": final_state.get("messages", []), "summary": final_state.get("summary", "")}
+                await queue.put({"index": idx, "state": final_state})
+            except Exception as e:
+                logger.error(f"❌ 배치 턴 실패 ({session_id} #{idx}): {e}")
+                await queue.put({"index": idx, "error": str(e)})
+
+    tasks = [asyncio.create_task(run_session(sid, indices)) for sid, indices in sessions.items()]
+    try:
+        for _ in range(len(states)):
+            yield await queue.get()
+    finally:
+        # 클라이언트가 스트림을 끊으면 남은 턴은 취소하고 정리될 때까지 대기
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
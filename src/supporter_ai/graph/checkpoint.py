@@ -0,0 +1,46 @@
+# src/supporter_ai/graph/checkpoint.py
+import uuid
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+from supporter_ai.common.config import settings
+from supporter_ai.graph.nodes.brain.speculation import speculation_tracker
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def redis_checkpointer(redis_url: Optional[str] = None):
+    """노드 단위 실행 결과를 Redis에 기록하는 체크포인터 (인덱스 생성까지 완료된 상태로 제공)"""
+    ttl = {"default_ttl": settings.CHECKPOINT_TTL_MINUTES, "refresh_on_read": True}
+    async with AsyncRedisSaver.from_conn_string(redis_url or settings.redis_url, ttl=ttl) as saver:
+        yield saver
+
+def thread_config(session_id: str) -> Dict[str, Any]:
+    """session_id를 체크포인트 thread_id로 사용하는 실행 설정"""
+    return {"configurable": {"thread_id": session_id}, "recursion_limit": 50}
+
+def with_turn_id(config: Dict[str, Any]) -> Dict[str, Any]:
+    """턴마다 고유한 turn_id를 붙인 실행 설정 (턴 종료 시 이 턴의 추측 expression 정리에 사용)"""
+    return {**config, "configurable": {**config.get("configurable", {}), "turn_id": uuid.uuid4().hex}}
+
+async def turn_input(graph, initial_state: Dict[str, Any], config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    그래프에 넘길 입력을 결정합니다. 체크포인터가 붙어 있고 같은 입력의 턴이 중간에 실패한 채
+    남아있다면 None을 돌려주어, 처음부터 다시 돌리지 않고 마지막으로 완료된 노드 이후부터 재개합니다.
+    """
+    if graph.checkpointer is not None:
+        snapshot = await graph.aget_state(config)
+        if snapshot.next and snapshot.values.get("input_text") == initial_state.get("input_text"):
+            logger.info(f"♻️ 중단된 턴 재개: {config['configurable']['thread_id']} -> {snapshot.next}")
+            return None
+    return initial_state
+
+async def run_turn(graph, initial_state: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """한 턴 실행 (중단된 턴이 있으면 이어서 실행)"""
+    config = with_turn_id(config)
+    try:
+        return await graph.ainvoke(await turn_input(graph, initial_state, config), config=config)
+    finally:
+        # 턴이 실패하는 등 가져가지 않은 추측 expression은 취소하고 miss로 집계
+        speculation_tracker.discard_owner(config["configurable"]["turn_id"])
@@ -0,0 +1,240 @@
+# src/supporter_ai/graph/nodes/brain/lora.py
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
+import httpx
+from supporter_ai.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+PERSONA_ADAPTERS = ["A", "B", "O", "AB"]
+BASE_MODEL = "base"
+
+def adapter_id(lora_name: str) -> str:
+    return f"adapter_{lora_name}"
+
+def lora_request(lora_name: str) -> Dict[str, str]:
+    """/load_lora_adapter에 전달하는 어댑터 등록 정보 (추론 시에는 adapter_id를 model로 지정)"""
+    name = adapter_id(lora_name)
+    return {"lora_name": name, "lora_path": f"{settings.LORA_BASE_PATH}/{name}"}
+
+def _vllm_client() -> httpx.AsyncClient:
+    """LLM_URL(/v1) 기준 vLLM 관리/추론 API 클라이언트"""
+    return httpx.AsyncClient(
+        base_url=settings.LLM_URL.rstrip("/"),
+        headers={"Authorization": f"Bearer {settings.LLM_API_KEY}"},
+        timeout=60
+    )
+
+class AdapterScheduler:
+    """
+    expression 요청을 어댑터별로 묶어서 실행하여 vLLM 내부의 어댑터 교체를 줄입니다.
+    - 유휴 상태에서 들어온 요청은 window 동안 모은 뒤 가장 먼저 대기한 어댑터 그룹부터 실행
+    - 실행 중인 어댑터와 같은 요청은 다른 그룹이 기다리고 있지 않으면 바로 합류
+    - 그룹의 요청이 모두 끝나거나 max_hold가 지나면 다음 어댑터 그룹으로 전환 (먼저 대기한 순서, 기아 방지)
+      느린 호출 하나가 다른 어댑터 요청을 호출 시간 내내 막지 않도록, 그룹의 독점 시간은 max_hold로 제한
+    window가 0이면 스케줄링 없이 바로 실행합니다.
+    """
+    def __init__(self, window_ms: int = 0, max_hold_ms: int = 200):
+        self.window = window_ms / 1000
+        self.max_hold = max_hold_ms / 1000
+        self.active: Optional[str] = None
+        self.switches = 0
+        self._generation = 0
+        self._inflight: Dict[int, int] = {}   # 그룹(세대)별 실행 중인 요청 수
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._hold_timer: Optional[asyncio.TimerHandle] = None
+        self._overdue = False                 # 현재 그룹이 max_hold를 넘겼는지
+
+    @property
+    def inflight(self) -> int:
+        return sum(self._inflight.values())
+
+    @asynccontextmanager
+    async def slot(self, adapter: str):
+        if self.window <= 0:
+            yield
+            return
+        generation = await self._acquire(adapter)
+        try:
+            yield
+        finally:
+            self._release(generation)
+
+    async def _acquire(self, adapter: str) -> int:
+        if adapter == self.active and not self._pending:
+            self._inflight[self._generation] += 1
+            return self._generation
+
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(adapter, []).append(fut)
+        if self._overdue:
+            self._switch()
+        elif self.active is None and self._dispatch_task is None:
+            self._dispatch_task = asyncio.create_task(self._dispatch_after_window())
+        try:
+            return await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release(fut.result())  # 차례를 받은 직후 취소된 경우
+            elif fut in self._pending.get(adapter, []):
+                self._pending[adapter].remove(fut)
+                if not self._pending[adapter]:
+                    del self._pending[adapter]
+            raise
+
+    def _release(self, generation: int):
+        self._inflight[generation] -= 1
+        if self._inflight[generation] == 0:
+            del self._inflight[generation]
+            if generation == self._generation:
+                self._switch()
+
+    async def _dispatch_after_window(self):
+        await asyncio.sleep(self.window)
+        self._dispatch_task = None
+        if self.active is None:
+            self._switch()
+
+    def _hold_expired(self, generation: int):
+        """그룹이 max_hold 이상 독점하면 남은 호출은 그대로 두고 다음 그룹에 차례를 넘김"""
+        if generation != self._generation:
+            return
+        if self._pending:
+            self._switch()
+        else:
+            self._overdue = True
+
+    def _switch(self):
+        """대기 중인 어댑터 그룹 중 가장 먼저 들어온 그룹을 한꺼번에 실행"""
+        self._overdue = False
+        if self._hold_timer:
+            self._hold_timer.cancel()
+            self._hold_timer = None
+        while self._pending:
+            adapter = next(iter(self._pending))
+            waiters = [fut for fut in self._pending.pop(adapter) if not fut.done()]
+            if not waiters:
+                continue
+            if self.active is not None and adapter != self.active:
+                self.switches += 1
+            self._generation += 1
+            self.active = adapter
+            self._inflight[self._generation] = len(waiters)
+            for fut in waiters:
+                fut.set_result(self._generation)
+            self._hold_timer = asyncio.get_running_loop().call_later(
+                self.max_hold, self._hold_expired, self._generation
+            )
+            return
+        self.active = None
+
+class LoraManager:
+    """페르소나 어댑터의 사전 등록/웜업 상태와 어댑터별 지연 시간을 관리합니다."""
+    def __init__(self, blood_types: List[str] = PERSONA_ADAPTERS):
+        self.status: Dict[str, str] = {b: "cold" for b in blood_types}  # cold / warm / missing
+        self.warmup_ms: Dict[str, float] = {}
+        self._latency: Dict[str, deque] = {}
+        self._wait: Dict[str, deque] = {}
+        self._calls: Dict[str, int] = {}
+        self._warming: Dict[str, asyncio.Task] = {}
+        self._retry_at: Dict[str, float] = {}
+
+    async def warm_up(self, client: Optional[httpx.AsyncClient] = None):
+        """모든 페르소나 어댑터를 vLLM에 등록하고 1토큰 생성으로 미리 로드"""
+        owns_client = client is None
+        client = client or _vllm_client()
+        try:
+            await asyncio.gather(*(self._warm_one(client, b) for b in self.status))
+        finally:
+            if owns_client:
+                await client.aclose()
+        logger.info(f"🔥 LoRA 어댑터 웜업 결과: {self.status}")
+
+    async def _warm_one(self, client: httpx.AsyncClient, blood: str):
+        """
+        어댑터를 등록하고 해당 어댑터 이름(model)으로 1토큰을 생성해 실제로 서빙되는지 확인합니다.
+        - 어댑터가 없다고 응답하면 missing, vLLM 연결 실패/일시 오류는 cold로 두고
+          두 경우 모두 LORA_RETRY_SECONDS 뒤 resolve에서 다시 웜업
+        """
+        name = adapter_id(blood)
+        try:
+            res = await client.post("/load_lora_adapter", json=lora_request(blood))
+            # 404: 런타임 등록이 꺼진 서버 (--lora-modules로 미리 띄운 경우) -> 아래 생성 요청으로 판단
+            already_loaded = res.status_code == 400 and "already" in res.text.lower()
+            if res.is_error and res.status_code != 404 and not already_loaded:
+                raise LookupError(f"load_lora_adapter {res.status_code}: {res.text[:200]}")
+
+            start = time.perf_counter()
+            res = await client.post("/chat/completions", json={
+                "model": name,
+                "messages": [{"role": "user", "content": "안녕"}],
+                "max_tokens": 1
+            })
+            if res.status_code in (400, 404):
+                raise LookupError(f"chat/completions {res.status_code}: {res.text[:200]}")
+            res.raise_for_status()
+            self.warmup_ms[blood] = (time.perf_counter() - start) * 1000
+            self.status[blood] = "warm"
+            self._retry_at.pop(blood, None)
+        except LookupError as e:
+            logger.warning(f"⚠️ LoRA 어댑터 {name} 없음 ({settings.LORA_RETRY_SECONDS}초 후 재시도): {e}")
+            self.status[blood] = "missing"
+            self._retry_at[blood] = time.monotonic() + settings.LORA_RETRY_SECONDS
+        except Exception as e:
+            logger.warning(f"⚠️ LoRA 어댑터 {name} 웜업 실패 ({settings.LORA_RETRY_SECONDS}초 후 재시도): {e}")
+            self.status[blood] = "cold"
+            self._retry_at[blood] = time.monotonic() + settings.LORA_RETRY_SECONDS
+
+    def resolve(self, blood: Optional[str]) -> Optional[str]:
+        """
+        expression 호출에 사용할 LoRA 이름을 결정합니다.
+        웜업되지 않았거나 없는 어댑터는 설정(LORA_FALLBACK_TO_BASE)에 따라 베이스 모델(None)로 대체하고,
+        웜업 전이거나 재시도 시각이 지난 어댑터는 백그라운드에서 웜업을 시작합니다.
+        """
+        if not blood or blood.lower() == "none":
+            return None
+        status = self.status.get(blood, "missing")
+        if status == "warm" or not settings.LORA_FALLBACK_TO_BASE:
+            return blood
+        retry_due = time.monotonic() >= self._retry_at.get(blood, 0.0)
+        if blood in self.status and retry_due and blood not in self._warming:
+            self._warming[blood] = asyncio.create_task(self._warm_in_background(blood))
+        return None
+
+    async def _warm_in_background(self, blood: str):
+        try:
+            async with _vllm_client() as client:
+                await self._warm_one(client, blood)
+        finally:
+            self._warming.pop(blood, None)
+
+    def record(self, adapter: Optional[str], latency: float, wait: float = 0.0):
+        """어댑터별 호출 지연(초)과 스케줄러 대기 시간(초) 기록"""
+        key = adapter or BASE_MODEL
+        self._calls[key] = self._calls.get(key, 0) + 1
+        self._latency.setdefault(key, deque(maxlen=500)).append(latency)
+        self._wait.setdefault(key, deque(maxlen=500)).append(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """어댑터별 상태/호출 수/지연 시간 요약 (/api/v1/metrics 노출용)"""
+        adapters = {}
+        for key in sorted(set(self.status) | set(self._calls)):
+            latency = sorted(self._latency.get(key, []))
+            wait = self._wait.get(key, [])
+            adapters[key] = {
+                "status": self.status.get(key, "base" if key == BASE_MODEL else "missing"),
+                "calls": self._calls.get(key, 0),
+                "warmup_ms": round(self.warmup_ms.get(key, 0.0), 1),
+                "avg_ms": round(sum(latency) / len(latency) * 1000, 1) if latency else 0.0,
+                "p95_ms": round(latency[min(len(latency) - 1, int(len(latency) * 0.95))] * 1000, 1) if latency else 0.0,
+                "avg_wait_ms": round(sum(wait) / len(wait) * 1000, 1) if wait else 0.0
+            }
+        return adapters
+
+lora_manager = LoraManager()
+lora_scheduler = AdapterScheduler(settings.LORA_SCHEDULE_WINDOW_MS, settings.LORA_GROUP_MAX_HOLD_MS)
@@ -1,12 +1,17 @@
 # src/supporter_ai/graph/nodes/brain/reasoning.py
 import json
 import re
+import time
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
+from langchain_core.runnables import RunnableConfig
 from supporter_ai.graph.state import SupporterState
 from supporter_ai.common.config import settings
+from supporter_ai.graph.nodes.brain.lora import adapter_id, lora_manager, lora_scheduler, BASE_MODEL
+from supporter_ai.graph.nodes.brain.speculation import speculation_tracker
+from supporter_ai.memory.knowledge import knowledge_store
 
 logger = logging.getLogger(__name__)
 
@@ -14,15 +19,13 @@ def get_llm(temperature=0.2, lora_name: str = None):
     # vLLM 전용 파라미터 (빈도 제어)
     extra_body = {"repetition_penalty": 1.1}
     
+    # vLLM은 model 필드로 LoRA 어댑터를 고름 (웜업 확인과 같은 경로)
+    model = settings.LLM_MODEL_NAME
     if lora_name and lora_name.lower() != "none":
-        adapter_id = f"adapter_{lora_name}"
-        extra_body["lora_request"] = {
-            "lora_name": adapter_id, 
-            "lora_path": f"/app/loras/{adapter_id}"
-        }
+        model = adapter_id(lora_name)
 
     return ChatOpenAI(
-        model=settings.LLM_MODEL_NAME,
+        model=model,
         openai_api_base=settings.LLM_URL,
         openai_api_key=settings.LLM_API_KEY,
         temperature=temperature,
@@ -31,6 +34,8 @@ def get_llm(temperature=0.2, lora_name: str = None):
         frequency_penalty=0.5,  # 동일 단어 반복 방지
         max_retries=2,
         timeout=30,
+        # /chat/stream(messages 모드)에서는 모든 호출이 스트리밍되므로 사용량 청크를 요청해야 토큰 집계가 됨
+        stream_usage=True,
         extra_body=extra_body
     )
 
@@ -38,10 +43,14 @@ def has_chinese(text: str) -> bool:
     """중국어 한자 포함 여부 확인"""
     return bool(re.search(r'[\u4e00-\u9fff]', text))
 
-async def safe_llm_call(llm: ChatOpenAI, messages: List[BaseMessage], max_retries: int = 5) -> str:
-    """중국어 발생 시 최대 5번 재시도하는 래퍼 함수"""
+async def safe_llm_call(
+    llm: ChatOpenAI, messages: List[BaseMessage], max_retries: int = 5, usage: Optional[Dict[str, int]] = None
+) -> str:
+    """중국어 발생 시 최대 5번 재시도하는 래퍼 함수 (usage가 주어지면 사용 토큰 누적)"""
     for i in range(max_retries):
         res = await llm.ainvoke(messages)
+        if usage is not None and res.usage_metadata:
+            usage["total_tokens"] = usage.get("total_tokens", 0) + res.usage_metadata.get("total_tokens", 0)
         content = res.content
         if not has_chinese(content):
             return content
@@ -83,10 +92,15 @@ async def orchestrator_node(state: SupporterState):
     logger.warning(f"⚠️ orchestrator_node 시도 중...")
     content = await safe_llm_call(llm, [SystemMessage(content=sys), HumanMessage(content=prompt)])
     data = parse_json_response(content)
+    tool_required = False if has_info else data.get("tool_required", False)
+
+    # 도구 결과가 들어오면 expression 입력이 바뀌므로 미리 돌려둔 생성은 취소
+    if tool_required:
+        speculation_tracker.discard(state.get("speculation_id"))
     
     return {
         "internal_thought": data.get("thought", "분석완료"),
-        "tool_required": False if has_info else data.get("tool_required", False)
+        "tool_required": tool_required
     }
 
 # --- [Node 3] Emotion ---
@@ -100,20 +114,53 @@ async def emotion_node(state: SupporterState):
     return {"mood_state": parse_json_response(content)}
 
 # --- [Node 4] Expression ---
-async def expression_node(state: SupporterState):
-    llm = get_llm(temperature=0.7, lora_name=state.get("blood_type"))
+async def generate_expression(state: SupporterState, usage: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
     blood = state.get("blood_type", "A")
+    # 웜업되지 않았거나 없는 어댑터는 설정에 따라 베이스 모델로 대체 (None)
+    adapter = lora_manager.resolve(blood)
+    llm = get_llm(temperature=0.7, lora_name=adapter)
     persona = {"A": "다정한", "B": "솔직한", "O": "밝은", "AB": "차분한"}.get(blood, "친절한")
+    search_results = state.get("search_results")
+    reference = f"\n- 참고정보: {search_results}" if search_results else ""
+    # 지식 그래프는 인메모리 캐시에서만 읽음 (미스면 생략)
+    facts = knowledge_store.facts(state.get("user_id"))
+    if facts:
+        reference += "\n- 관계: " + "; ".join(f"{t.subject} {t.relation} {t.object}" for t in facts)
 
     # [중요] 대화를 주고받도록 강제: 혼자 길게 말하지 말 것
     sys = f"""너는 {blood}형 {persona} 친구야. 
 - 오직 한국어 반말만 사용. 중국어 절대 금지.
-- 기억: {state.get('summary', '')}
+- 기억: {state.get('summary', '')}{reference}
 - 규칙: 짧게 한두 문장으로만 말해. 혼자 길게 떠들지 말고 질문을 던지거나 리액션만 해. 대화를 이어가는 게 목적이야.
 - 형식: {{ "text": "할말", "emotion": "표정" }}"""
 
     messages = [SystemMessage(content=sys)] + state.get("messages", []) + [HumanMessage(content=state['input_text'])]
 
     logger.warning(f"⚠️ expression_node 시도 중...")
-    content = await safe_llm_call(llm, messages)
-    return {"final_output": parse_json_response(content)}
\ No newline at end of file
+    # 같은 어댑터 요청끼리 묶어서 실행하여 vLLM 어댑터 교체 최소화
+    queued_at = time.perf_counter()
+    async with lora_scheduler.slot(adapter or BASE_MODEL):
+        started_at = time.perf_counter()
+        content = await safe_llm_call(llm, messages, usage=usage)
+    lora_manager.record(adapter, time.perf_counter() - started_at, wait=started_at - queued_at)
+    return parse_json_response(content)
+
+async def speculate_expression_node(state: SupporterState, config: RunnableConfig):
+    """
+    [추측 실행] expression은 emotion 결과를 쓰지 않으므로 메모리 로드 직후 분석 노드와 병렬로 생성을 시작합니다.
+    도구가 필요 없으면 expression_node가 이 결과를 그대로 쓰고, 도구가 선택되면 orchestrator가 취소합니다.
+    턴이 그 전에 끝나면(실패 등) run_turn/stream_turn이 turn_id 기준으로 취소합니다.
+    """
+    snapshot = dict(state)
+    turn_id = config.get("configurable", {}).get("turn_id")
+    return {"speculation_id": speculation_tracker.start(lambda usage: generate_expression(snapshot, usage), turn_id)}
+
+async def expression_node(state: SupporterState):
+    # 도구 결과 없이 끝난 턴이면 미리 생성해둔 결과 사용 (추측 실행 모드가 아니면 None)
+    if not state.get("search_results"):
+        speculated = await speculation_tracker.take(state.get("speculation_id"))
+        if speculated is not None:
+            return {"final_output": speculated}
+    else:
+        speculation_tracker.discard(state.get("speculation_id"))
+    return {"final_output": await generate_expression(state)}
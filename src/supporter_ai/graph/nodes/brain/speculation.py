@@ -0,0 +1,116 @@
+# src/supporter_ai/graph/nodes/brain/speculation.py
+import time
+import uuid
+import asyncio
+import logging
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 턴 종료 시 정리되지 않은 추측(다른 워커에서 재개된 턴 등)을 miss로 정리하기까지의 시간
+SPECULATION_TTL = 60
+
+class Speculation:
+    def __init__(self, task: asyncio.Task, usage: Dict[str, int], owner: Optional[str] = None):
+        self.task = task
+        self.usage = usage
+        self.owner = owner
+        self.expiry: Optional[asyncio.TimerHandle] = None
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    def elapsed(self) -> float:
+        """추측 생성이 실제로 돌아간 시간 (완료됐으면 완료 시점까지)"""
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+class SpeculationTracker:
+    """
+    분석 노드(sensory -> orchestrator -> emotion)와 병렬로 미리 돌려둔 expression 생성을 관리합니다.
+    도구 없이 끝나면 결과를 그대로 쓰고(hit), 도구가 선택되거나 턴이 결과를 쓰지 못하고 끝나면 취소합니다(miss).
+    hit에서 숨겨진 지연 시간과 miss에서 버려진 토큰을 함께 집계해 추측 실행 여부를 조정할 수 있게 합니다.
+    """
+    def __init__(self):
+        self._running: Dict[str, Speculation] = {}
+        self.hits = 0
+        self.misses = 0
+        self.cancelled_inflight = 0   # 생성 도중 취소되어 토큰 사용량을 알 수 없는 횟수
+        self.saved_seconds = 0.0
+        self.wasted_seconds = 0.0
+        self.wasted_tokens = 0
+
+    def start(
+        self, generate: Callable[[Dict[str, int]], Awaitable[Dict[str, Any]]], owner: Optional[str] = None
+    ) -> str:
+        """generate(usage)를 백그라운드로 시작하고 추측 ID를 반환 (owner: 턴 종료 시 discard_owner로 정리할 턴 ID)"""
+        key = uuid.uuid4().hex
+        usage: Dict[str, int] = {}
+        spec = Speculation(asyncio.create_task(generate(usage)), usage, owner)
+
+        def on_done(task: asyncio.Task):
+            spec.finished_at = time.perf_counter()
+            if not task.cancelled():
+                task.exception()  # 버려진 추측의 예외가 경고로 남지 않도록 확인 처리
+
+        spec.task.add_done_callback(on_done)
+        spec.expiry = asyncio.get_running_loop().call_later(SPECULATION_TTL, self._expire, key)
+        self._running[key] = spec
+        return key
+
+    def _pop(self, key: Optional[str]) -> Optional[Speculation]:
+        spec = self._running.pop(key, None) if key else None
+        if spec is not None and spec.expiry is not None:
+            spec.expiry.cancel()
+        return spec
+
+    def _expire(self, key: str):
+        if key in self._running:
+            logger.warning(f"⚠️ 사용되지 않은 추측 expression 만료: {key}")
+            self.discard(key)
+
+    async def take(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """추측 결과를 기다려 가져옵니다. 없거나 실패했으면 None (호출 측에서 새로 생성)"""
+        spec = self._pop(key)
+        if spec is None:
+            return None
+        # 이미 진행된 만큼이 expression 단계에서 절약된 시간
+        saved = spec.elapsed()
+        try:
+            result = await spec.task
+        except Exception as e:
+            logger.warning(f"⚠️ 추측 expression 실패, 새로 생성: {e}")
+            return None
+        self.hits += 1
+        self.saved_seconds += saved
+        return result
+
+    def discard(self, key: Optional[str]):
+        """도구 사용 등으로 입력이 바뀌어 추측 결과를 쓸 수 없을 때 취소하고 낭비량을 기록"""
+        spec = self._pop(key)
+        if spec is None:
+            return
+        self.misses += 1
+        self.wasted_seconds += spec.elapsed()
+        if not spec.task.done():
+            spec.task.cancel()
+            self.cancelled_inflight += 1
+        # 완료된 LLM 호출(재시도 포함)의 토큰만 집계 가능
+        self.wasted_tokens += spec.usage.get("total_tokens", 0)
+
+    def discard_owner(self, owner: str):
+        """턴이 끝났는데(실패 포함) 가져가지 않은 해당 턴의 추측을 모두 취소하고 miss로 기록"""
+        for key in [k for k, spec in self._running.items() if spec.owner == owner]:
+            self.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "saved_ms": round(self.saved_seconds * 1000, 1),
+            "wasted_ms": round(self.wasted_seconds * 1000, 1),
+            "wasted_tokens": self.wasted_tokens,
+            "cancelled_inflight": self.cancelled_inflight
+        }
+
+speculation_tracker = SpeculationTracker()
@@ -1,20 +1,20 @@
 # src/supporter_ai/graph/nodes/tools/memory.py
-import json
 import logging
-import redis.asyncio as redis
-from supporter_ai.common.config import settings
 from supporter_ai.graph.state import SupporterState
+from supporter_ai.memory.session_store import session_store
+from supporter_ai.memory.knowledge import knowledge_store, extract_triples
 from langchain_core.messages import messages_from_dict, messages_to_dict, HumanMessage, AIMessage, SystemMessage
-from supporter_ai.graph.nodes.brain.reasoning import get_llm
+from supporter_ai.graph.nodes.brain.reasoning import get_llm, parse_json_response
 
 logger = logging.getLogger(__name__)
-redis_client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True)
 
 async def load_memory_node(state: SupporterState):
     session_id = state.get("session_id", "default")
-    raw_data = await redis_client.get(f"supporter:context:{session_id}")
-    if raw_data:
-        data = json.loads(raw_data)
+    # expression 단계 전에 사용자 지식 그래프를 캐시에 올려둠 (응답 경로에서 그래프 쿼리 방지)
+    knowledge_store.prefetch(state.get("user_id"))
+    # Redis에 없으면 콜드 저장소(PostgreSQL)에서 복원
+    data = await session_store.load(session_id)
+    if data:
         return {
             "messages": messages_from_dict(data.get("messages", [])),
             "summary": data.get("summary", ""),
@@ -31,28 +31,38 @@ async def update_history_node(state: SupporterState):
     # 리듀서가 없으므로 합쳐진 리스트를 반환하여 상태를 갱신함
     return {"messages": messages + [new_user_msg, new_ai_msg]}
 
-async def summarize_node(state: SupporterState):
+async def summarize_node(state: SupporterState, record_facts: bool = True):
     messages = state.get("messages", [])
     if len(messages) <= 10:
         return {}
 
     llm = get_llm(temperature=0.1)
     # Prompt Diet: 핵심 정보 위주 압축
-    sys = "기억 압축기. 한국어만 사용. 중국어 금지"
+    sys = "기억 압축기. 한국어만 사용. 중국어 금지. JSON 응답."
     prompt = f"""기존요약: {state.get("summary", "")}
 추가내용: {messages[:-4]}
-지침: 이름, 취향 등 팩트 위주로 100자 내 압축."""
+지침: 이름, 취향 등 팩트 위주로 100자 내 압축. 인물/사실 관계는 facts에 [주어, 관계, 대상]으로 추출.
+형식: {{"summary": "요약", "facts": [["주어", "관계", "대상"]]}}"""
 
     # 여기서도 중국어 체크 적용
     from supporter_ai.graph.nodes.brain.reasoning import safe_llm_call
     logger.warning(f"⚠️ summarize_node 시도 중...")
     content = await safe_llm_call(llm, [SystemMessage(content=sys), HumanMessage(content=prompt)])
+    data = parse_json_response(content)
+
+    # 추출된 사실은 큐에만 넣고 Neo4j 저장은 백그라운드 작업이 일괄 처리 (write-behind)
+    if record_facts:
+        knowledge_store.enqueue(state.get("user_id"), extract_triples(data.get("facts")))
     
     return {
-        "summary": content.strip(),
+        "summary": str(data.get("summary") or data.get("text") or content).strip(),
         "messages": messages[-4:] 
     }
 
+async def summarize_eval_node(state: SupporterState):
+    """평가용(persist=False) 요약: 요약만 하고 지식 그래프에는 사실을 기록하지 않음"""
+    return await summarize_node(state, record_facts=False)
+
 async def save_memory_node(state: SupporterState):
     session_id = state.get("session_id", "default")
     data = {
@@ -60,6 +70,7 @@ async def save_memory_node(state: SupporterState):
         "summary": state.get("summary", ""),
         "blood_type": state.get("blood_type")
     }
-    await redis_client.setex(f"supporter:context:{session_id}", 3600, json.dumps(data))
+    # 유휴 세션은 백그라운드 작업이 PostgreSQL로 이관 (session_store.run_flush_loop)
+    await session_store.save(session_id, data)
     logger.info(f"💾 세션 {session_id} 저장 완료.")
     return state
\ No newline at end of file
@@ -20,6 +20,7 @@ class SupporterState(TypedDict):
     mood_state: Dict[str, Any] # 현재 감정 { "type": "happy", "score": 0.8 }
     search_results: str        # 도구가 가져온 지식
     internal_thought: str      # 브레인의 사고 과정
+    speculation_id: str        # 추측 실행 중인 expression 생성 ID (speculative 모드)
     
     # 4. 최종 출력
     final_output: Dict[str, Any] # { "text": "...", "emotion": "...", "action": "..." }
\ No newline at end of file
@@ -0,0 +1,113 @@
+# src/supporter_ai/graph/streaming.py
+import re
+from typing import Any, AsyncIterator, Dict, Optional
+from supporter_ai.graph.checkpoint import turn_input, with_turn_id
+from supporter_ai.graph.nodes.brain.speculation import speculation_tracker
+
+TEXT_FIELD = re.compile(r'"text"\s*:\s*"')
+ESCAPES = {"n": "\n", "t": "\t", "r": "", "b": "", "f": ""}
+
+class TextFieldStreamer:
+    """
+    expression 응답({"text": "...", "emotion": "..."})이 토큰 단위로 들어올 때
+    "text" 값만 순서대로 뽑아내는 스트리밍 파서. JSON이 아닌 응답은 그대로 내보냅니다.
+    """
+    def __init__(self):
+        self.buffer = ""
+        self.cursor: Optional[int] = None
+        self.plain = False
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        if self.done:
+            return ""
+        if self.plain:
+            return chunk
+
+        if self.cursor is None:
+            head = self.buffer.lstrip()
+            if head and head[0] not in "{`":
+                self.plain = True
+                return self.buffer
+            match = TEXT_FIELD.search(self.buffer)
+            if not match:
+                return ""
+            self.cursor = match.end()
+
+        out = []
+        i = self.cursor
+        while i < len(self.buffer):
+            c = self.buffer[i]
+            if c == "\\":
+                # 이스케이프 시퀀스가 잘려서 들어온 경우 다음 토큰까지 대기
+                if i + 1 >= len(self.buffer):
+                    break
+                nxt = self.buffer[i + 1]
+                if nxt == "u":
+                    if i + 6 > len(self.buffer):
+                        break
+                    code = self._hex(i + 2)
+                    if code is not None and 0xD800 <= code <= 0xDBFF:
+                        # 이모지 등 BMP 밖 문자는 \ud83d\ude00처럼 서로게이트 쌍으로 오므로 뒤쪽 절반까지 기다려 합침
+                        if i + 12 > len(self.buffer):
+                            break
+                        low = self._hex(i + 8) if self.buffer[i + 6:i + 8] == "\\u" else None
+                        if low is not None and 0xDC00 <= low <= 0xDFFF:
+                            out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                            i += 12
+                            continue
+                    # 짝이 없는 서로게이트는 UTF-8로 인코딩할 수 없으므로 버림
+                    if code is not None and not 0xD800 <= code <= 0xDFFF:
+                        out.append(chr(code))
+                    i += 6
+                    continue
+                out.append(ESCAPES.get(nxt, nxt))
+                i += 2
+                continue
+            if c == '"':
+                self.done = True
+                i += 1
+                break
+            out.append(c)
+            i += 1
+        self.cursor = i
+        return "".join(out)
+
+    def _hex(self, start: int) -> Optional[int]:
+        try:
+            return int(self.buffer[start:start + 4], 16)
+        except ValueError:
+            return None
+
+async def stream_turn(graph, initial_state: Dict[str, Any], config: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    한 턴을 실행하며 expression 답변을 토큰 단위로 내보냅니다.
+    - {"type": "token", "text": ...}: 답변 텍스트 조각
+    - {"type": "reset"}: 재시도(중국어 감지 등)로 답변을 처음부터 다시 생성하는 경우
+    - {"type": "final", "state": 최종 상태}: 마지막 이벤트 (추측 실행이 적중하면 토큰 없이 바로 final)
+    """
+    final_state: Dict[str, Any] = {}
+    streamer, run_id = TextFieldStreamer(), None
+    config = with_turn_id(config)
+    try:
+        inputs = await turn_input(graph, initial_state, config)
+        async for mode, chunk in graph.astream(inputs, config=config, stream_mode=["messages", "values"]):
+            if mode == "values":
+                final_state = chunk
+                continue
+
+            message, metadata = chunk
+            if metadata.get("langgraph_node") != "expression" or not isinstance(message.content, str):
+                continue
+            if message.id != run_id:
+                if run_id is not None:
+                    yield {"type": "reset"}
+                streamer, run_id = TextFieldStreamer(), message.id
+            text = streamer.feed(message.content)
+            if text:
+                yield {"type": "token", "text": text}
+    finally:
+        speculation_tracker.discard_owner(config["configurable"]["turn_id"])
+
+    yield {"type": "final", "state": final_state}
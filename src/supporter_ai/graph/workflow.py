@@ -2,29 +2,45 @@
 from langgraph.graph import StateGraph, END, START
 from supporter_ai.graph.state import SupporterState
 from supporter_ai.graph.nodes.tools.memory import (
-    load_memory_node, save_memory_node, summarize_node, update_history_node
+    load_memory_node, save_memory_node, summarize_node, summarize_eval_node, update_history_node
 )
 from supporter_ai.graph.nodes.tools.gateway import tool_gateway_node
 from supporter_ai.graph.nodes.brain.reasoning import (
-    sensory_node, orchestrator_node, emotion_node, expression_node
+    sensory_node, orchestrator_node, emotion_node, expression_node, speculate_expression_node
 ) # reflection_node 제거
 
-async def create_supporter_workflow():
+async def create_supporter_workflow(checkpointer=None, persist: bool = True, speculative: bool = False):
+    """
+    persist=False: 평가/대량 처리용. Redis 로드/저장 노드를 빼고
+    요약까지만 실행합니다 (세션 맥락은 호출 측에서 state로 넘겨줌). 지식 그래프에도 기록하지 않습니다.
+    speculative=True: 메모리 로드 직후 expression 생성을 분석 노드와 병렬로 미리 시작합니다.
+    """
     workflow = StateGraph(SupporterState)
 
-    workflow.add_node("load_memory", load_memory_node)
+    if persist:
+        workflow.add_node("load_memory", load_memory_node)
+    if speculative:
+        workflow.add_node("speculate_expression", speculate_expression_node)
     workflow.add_node("sensory_analyze", sensory_node)
     workflow.add_node("orchestrator", orchestrator_node)
     workflow.add_node("tool_gateway", tool_gateway_node)
     workflow.add_node("emotion_update", emotion_node)
     workflow.add_node("expression", expression_node)
     workflow.add_node("update_history", update_history_node)
-    workflow.add_node("summarize", summarize_node)
-    workflow.add_node("save_memory", save_memory_node) 
+    workflow.add_node("summarize", summarize_node if persist else summarize_eval_node)
+    if persist:
+        workflow.add_node("save_memory", save_memory_node) 
 
     # 엣지 연결
-    workflow.add_edge(START, "load_memory")
-    workflow.add_edge("load_memory", "sensory_analyze")
+    # 시작 구간: (load_memory) -> (speculate_expression) -> sensory_analyze
+    entry = [START]
+    if persist:
+        entry.append("load_memory")
+    if speculative:
+        entry.append("speculate_expression")
+    entry.append("sensory_analyze")
+    for src, dst in zip(entry, entry[1:]):
+        workflow.add_edge(src, dst)
     workflow.add_edge("sensory_analyze", "orchestrator")
     
     workflow.add_conditional_edges(
@@ -38,7 +54,11 @@ async def create_supporter_workflow():
     workflow.add_edge("emotion_update", "expression")
     workflow.add_edge("expression", "update_history")
     workflow.add_edge("update_history", "summarize")
-    workflow.add_edge("summarize", "save_memory") # reflection 생략
-    workflow.add_edge("save_memory", END)
+    if persist:
+        workflow.add_edge("summarize", "save_memory") # reflection 생략
+        workflow.add_edge("save_memory", END)
+    else:
+        workflow.add_edge("summarize", END)
 
-    return workflow.compile()
\ No newline at end of file
+    # checkpointer가 주어지면 노드마다 상태가 저장되어 다른 워커에서도 이어서 실행 가능
+    return workflow.compile(checkpointer=checkpointer)
\ No newline at end of file
@@ -1,13 +1,23 @@
+import json
+import asyncio
 import traceback
 import uvicorn
 import time
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, AsyncExitStack
 from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from loguru import logger
 
 from supporter_ai.graph.workflow import create_supporter_workflow
+from supporter_ai.graph.checkpoint import redis_checkpointer, thread_config, run_turn
+from supporter_ai.graph.batch import run_batch
+from supporter_ai.graph.streaming import stream_turn
+from supporter_ai.graph.nodes.brain.lora import lora_manager, lora_scheduler
+from supporter_ai.graph.nodes.brain.speculation import speculation_tracker
+from supporter_ai.memory.session_store import session_store
+from supporter_ai.memory.knowledge import knowledge_store
 from supporter_ai.common.config import settings
 
 # 앱 상태 공유
@@ -16,16 +26,38 @@ app_state: Dict[str, Any] = {}
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """서버 시작 시 랭그래프 엔진 로딩"""
-    try:
-        logger.info("🚀 Supporter AI 하이브리드 엔진 로딩 중...")
-        # 랭그래프 워크플로우 생성 및 컴파일
-        app_state["graph"] = await create_supporter_workflow()
-        yield 
-    except Exception as e:
-        logger.error(f"❌ 엔진 초기화 실패: {traceback.format_exc()}")
-        raise e
-    finally:
-        app_state.clear()
+    async with AsyncExitStack() as stack:
+        try:
+            logger.info("🚀 Supporter AI 하이브리드 엔진 로딩 중...")
+            # 체크포인트 모드: 워커는 상태를 들고 있지 않고 Redis에서 턴을 이어받음
+            checkpointer = None
+            if settings.CHECKPOINT_ENABLED:
+                checkpointer = await stack.enter_async_context(redis_checkpointer())
+                logger.info("🧷 Redis 체크포인터 활성화 (session_id = thread_id)")
+            # 세션 콜드 저장소 준비 및 유휴 세션 이관 작업 시작
+            # (PostgreSQL이 없으면 Redis 단기 기억만으로 동작하고, 이관 작업이 연결을 재시도)
+            await session_store.setup()
+            flush_task = asyncio.create_task(session_store.run_flush_loop())
+            stack.callback(flush_task.cancel)
+            # 지식 그래프 write-behind 작업 시작 (종료 시 남은 사실 저장)
+            await knowledge_store.start()
+            stack.push_async_callback(knowledge_store.close)
+            # 페르소나 LoRA 어댑터를 미리 올려 첫 요청의 어댑터 로딩 지연 제거
+            if settings.LORA_WARMUP:
+                await lora_manager.warm_up()
+            # 랭그래프 워크플로우 생성 및 컴파일
+            speculative = settings.SPECULATIVE_EXPRESSION
+            app_state["graph"] = await create_supporter_workflow(checkpointer=checkpointer, speculative=speculative)
+            # 배치 요청 전체가 공유하는 동시 실행 한도 (vLLM 처리 용량 기준)
+            app_state["batch_capacity"] = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+            # 평가용 그래프: 메모리 로드/저장 노드 없이 실행 (배치 요청의 skip_persistence)
+            app_state["eval_graph"] = await create_supporter_workflow(persist=False, speculative=speculative)
+            yield 
+        except Exception as e:
+            logger.error(f"❌ 엔진 초기화 실패: {traceback.format_exc()}")
+            raise e
+        finally:
+            app_state.clear()
 
 app = FastAPI(title="Supporter AI API", lifespan=lifespan)
 
@@ -38,6 +70,54 @@ class ChatRequest(BaseModel):
     enabled_tools: Optional[List[str]] = []        # 활성화 도구 플래그
     disabled_tools: Optional[List[str]] = []
 
+def build_initial_state(req: ChatRequest) -> Dict[str, Any]:
+    """그래프 시작 상태 구성 (체크포인트에 남은 이전 턴 값이 섞이지 않도록 턴 단위 필드 초기화)"""
+    return {
+        "input_text": req.message,
+        "user_id": req.user_id,
+        "session_id": req.session_id,
+        "blood_type": req.blood_type,
+        "enabled_tools": req.enabled_tools,
+        "disabled_tools": req.disabled_tools,
+        "messages": [], # load_memory_node에서 Redis 데이터로 채워짐
+        "search_results": "",
+        "final_output": {}
+    }
+
+class BatchChatRequest(BaseModel):
+    items: List[ChatRequest]
+    skip_persistence: bool = False                 # 평가 실행: Redis 로드/저장 생략
+    max_concurrency: Optional[int] = Field(None, ge=1)  # 이 요청만의 추가 한도 (앱 전체 한도는 BATCH_MAX_CONCURRENCY)
+
+FALLBACK_RESPONSE = {
+    "text": "미안해, 대답을 준비하는 중에 문제가 생겼어. 다시 말해줄래?",
+    "emotion": "sad",
+    "action": "none"
+}
+
+def build_response(final_state: Dict[str, Any]) -> Dict[str, Any]:
+    """최종 상태에서 응답 본문과 디버깅용 메타데이터를 추출"""
+    ai_response = final_state.get("final_output")
+    
+    # 방어적 코드: 응답이 없는 경우
+    if not ai_response or not isinstance(ai_response, dict):
+        ai_response = FALLBACK_RESPONSE
+
+    # 클라이언트 디버깅용 메타데이터 구성
+    metadata = {
+        "blood_type": final_state.get("blood_type"),
+        "mood": final_state.get("mood_state"),
+        "thought": final_state.get("internal_thought"),
+        "search_results": final_state.get("search_results"),
+        "summary": final_state.get("summary"),
+        "active_tools": final_state.get("enabled_tools")
+    }
+    return {
+        "status": "success", 
+        "response": ai_response,
+        "metadata": metadata
+    }
+
 async def run_post_processing(graph, state: Dict[str, Any]):
     """
     요약(Summarize), 저장(Save), 성찰(Reflection) 등 무거운 작업을 
@@ -60,60 +140,87 @@ async def chat(req: ChatRequest, background_tasks: BackgroundTasks):
         raise HTTPException(status_code=503, detail="시스템 로딩 중")
 
     # 그래프 시작 상태 설정
-    initial_state = {
-        "input_text": req.message,
-        "user_id": req.user_id,
-        "session_id": req.session_id,
-        "blood_type": req.blood_type,
-        "enabled_tools": req.enabled_tools,
-        "disabled_tools": req.disabled_tools,
-        "messages": [] # load_memory_node에서 Redis 데이터로 채워짐
-    }
+    initial_state = build_initial_state(req)
 
     try:
         # 1. 랭그래프 실행
         # [참고] 현재 workflow 구조상 save_memory까지 일직선으로 실행됩니다.
         # recursion_limit을 50으로 늘려 루프 에러를 방지합니다.
-        final_state = await graph.ainvoke(
-            initial_state, 
-            config={"recursion_limit": 50}
-        )
-        
-        # 2. 결과 추출
-        ai_response = final_state.get("final_output")
+        # 체크포인트 모드에서는 session_id 기준으로 중단된 턴이 있으면 이어서 실행합니다.
+        final_state = await run_turn(graph, initial_state, thread_config(req.session_id))
         
-        # 방어적 코드: 응답이 없는 경우
-        if not ai_response or not isinstance(ai_response, dict):
-            ai_response = {
-                "text": "미안해, 대답을 준비하는 중에 문제가 생겼어. 다시 말해줄래?",
-                "emotion": "sad",
-                "action": "none"
-            }
-
-        # 3. 백그라운드 작업 등록
+        # 2. 백그라운드 작업 등록
         # 요약 및 성찰 결과가 포함된 상태를 백그라운드 로그에 남깁니다.
         background_tasks.add_task(run_post_processing, graph, final_state)
 
-        # 4. 클라이언트 디버깅용 메타데이터 구성
-        metadata = {
-            "blood_type": final_state.get("blood_type"),
-            "mood": final_state.get("mood_state"),
-            "thought": final_state.get("internal_thought"),
-            "search_results": final_state.get("search_results"),
-            "summary": final_state.get("summary"),
-            "active_tools": final_state.get("enabled_tools")
-        }
-
-        # 성공 응답 반환
-        return {
-            "status": "success", 
-            "response": ai_response,
-            "metadata": metadata
-        }
+        # 3. 결과 추출 및 성공 응답 반환
+        return build_response(final_state)
         
     except Exception as e:
         logger.error(f"❌ 채팅 실행 에러: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    /chat과 같은 턴을 실행하되 답변을 토큰 단위 NDJSON 이벤트로 스트리밍합니다.
+    {"type": "token"|"reset"} 이벤트 뒤에 /chat 응답과 같은 본문의 {"type": "final"}이 옵니다.
+    """
+    graph = app_state.get("graph")
+    if not graph:
+        raise HTTPException(status_code=503, detail="시스템 로딩 중")
+
+    initial_state = build_initial_state(req)
+
+    async def stream_events():
+        try:
+            async for event in stream_turn(graph, initial_state, thread_config(req.session_id)):
+                if event["type"] == "final":
+                    await run_post_processing(graph, event["state"])
+                    event = {"type": "final", **build_response(event["state"])}
+                yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"❌ 스트리밍 채팅 실행 에러: {traceback.format_exc()}")
+            yield json.dumps({"type": "error", "detail": str(e)}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream_events(), media_type="application/x-ndjson")
+
+@app.post("/api/v1/chat/batch")
+async def chat_batch(req: BatchChatRequest):
+    """
+    야간 회귀 평가 등 대량 처리용. 여러 턴을 동시에 실행하고
+    끝나는 순서대로 NDJSON 한 줄씩 스트리밍합니다 (각 줄의 index = 요청 순번).
+    """
+    graph = app_state.get("eval_graph" if req.skip_persistence else "graph")
+    if not graph:
+        raise HTTPException(status_code=503, detail="시스템 로딩 중")
+
+    states = [build_initial_state(item) for item in req.items]
+    capacity = app_state["batch_capacity"]
+
+    async def stream_results():
+        async for result in run_batch(
+            graph, states, capacity, req.max_concurrency, carry_memory=req.skip_persistence
+        ):
+            idx = result["index"]
+            line = {"index": idx, "session_id": states[idx]["session_id"]}
+            if "error" in result:
+                line.update({"status": "error", "detail": result["error"]})
+            else:
+                line.update(build_response(result["state"]))
+            yield json.dumps(line, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.get("/api/v1/metrics")
+async def metrics():
+    """운영 지표: LoRA 어댑터, 추측 expression, 세션 계층, 지식 그래프 저장/캐시 현황"""
+    return {
+        "lora": {"adapters": lora_manager.stats(), "switches": lora_scheduler.switches},
+        "speculation": speculation_tracker.stats(),
+        "sessions": session_store.stats(),
+        "knowledge": knowledge_store.stats()
+    }
+
 if __name__ == "__main__":
     uvicorn.run("supporter_ai.main:app", host="0.0.0.0", port=settings.APP_PORT, reload=settings.DEBUG)
\ No newline at end of file
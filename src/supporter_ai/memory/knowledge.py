@@ -0,0 +1,298 @@
+# src/supporter_ai/memory/knowledge.py
+import json
+import time
+import uuid
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+import redis.asyncio as redis
+from neo4j import AsyncGraphDatabase
+from supporter_ai.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 저장을 마친 워커가 사용자 목록을 알려 다른 워커의 캐시를 갱신하게 하는 채널
+INVALIDATE_CHANNEL = "supporter:knowledge:invalidate"
+
+class Triple(NamedTuple):
+    subject: str
+    relation: str
+    object: str
+
+def extract_triples(raw_facts: Any) -> List[Triple]:
+    """LLM이 돌려준 facts 목록에서 (주어, 관계, 대상) 형태만 골라냄"""
+    triples = []
+    for fact in raw_facts if isinstance(raw_facts, list) else []:
+        if isinstance(fact, dict):
+            fact = [fact.get("subject"), fact.get("relation"), fact.get("object")]
+        if isinstance(fact, (list, tuple)) and len(fact) == 3 and all(isinstance(v, str) and v.strip() for v in fact):
+            triples.append(Triple(*(v.strip() for v in fact)))
+    return triples
+
+class KnowledgeBackend(ABC):
+    """지식 그래프 저장소 인터페이스 (Neo4j / 오프라인 테스트용 인메모리)"""
+    async def setup(self):
+        pass
+
+    @abstractmethod
+    async def upsert(self, rows: List[Tuple[str, Triple]]):
+        """(user_id, triple) 묶음을 한 번에 저장"""
+
+    @abstractmethod
+    async def fetch(self, user_id: str, limit: int) -> List[Triple]:
+        """사용자의 최근 사실 관계 조회"""
+
+    async def close(self):
+        pass
+
+class InMemoryKnowledgeBackend(KnowledgeBackend):
+    def __init__(self):
+        self.graph: Dict[str, List[Triple]] = {}
+        self.upsert_calls = 0
+        self.fetch_calls = 0
+
+    async def upsert(self, rows: List[Tuple[str, Triple]]):
+        self.upsert_calls += 1
+        for user_id, triple in rows:
+            facts = self.graph.setdefault(user_id, [])
+            if triple in facts:
+                facts.remove(triple)
+            facts.append(triple)
+
+    async def fetch(self, user_id: str, limit: int) -> List[Triple]:
+        self.fetch_calls += 1
+        return list(reversed(self.graph.get(user_id, [])))[:limit]
+
+class Neo4jKnowledgeBackend(KnowledgeBackend):
+    # 관계 타입은 파라미터로 넘길 수 없으므로 :REL {type} 하나로 저장
+    UPSERT = """
+    UNWIND $rows AS row
+    MERGE (s:Entity {user_id: row.user_id, name: row.subject})
+    MERGE (o:Entity {user_id: row.user_id, name: row.object})
+    MERGE (s)-[r:REL {type: row.relation}]->(o)
+    SET r.updated_at = timestamp()
+    """
+    FETCH = """
+    MATCH (s:Entity {user_id: $user_id})-[r:REL]->(o:Entity)
+    RETURN s.name AS subject, r.type AS relation, o.name AS object
+    ORDER BY r.updated_at DESC LIMIT $limit
+    """
+
+    def __init__(self, uri: str, user: str, password: str):
+        self.driver = AsyncGraphDatabase.driver(uri, auth=(user, password))
+
+    async def setup(self):
+        await self.driver.execute_query(
+            "CREATE INDEX entity_user_name IF NOT EXISTS FOR (e:Entity) ON (e.user_id, e.name)"
+        )
+
+    async def upsert(self, rows: List[Tuple[str, Triple]]):
+        params = [{"user_id": user_id, **triple._asdict()} for user_id, triple in rows]
+        await self.driver.execute_query(self.UPSERT, rows=params)
+
+    async def fetch(self, user_id: str, limit: int) -> List[Triple]:
+        records, _, _ = await self.driver.execute_query(self.FETCH, user_id=user_id, limit=limit)
+        return [Triple(r["subject"], r["relation"], r["object"]) for r in records]
+
+    async def close(self):
+        await self.driver.close()
+
+def create_backend(kind: Optional[str] = None) -> KnowledgeBackend:
+    kind = kind or settings.KNOWLEDGE_BACKEND
+    if kind == "memory":
+        return InMemoryKnowledgeBackend()
+    if kind == "neo4j":
+        return Neo4jKnowledgeBackend(settings.NEO4J_URI, settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+    raise ValueError(f"알 수 없는 KNOWLEDGE_BACKEND: {kind}")
+
+class KnowledgeStore:
+    """
+    지식 그래프 write-behind 저장소.
+    - 쓰기: summarize에서 추출한 사실을 큐에 넣고, 백그라운드 작업이 배치 단위로 백엔드에 upsert
+    - 읽기: 사용자별 인메모리 인접 리스트 캐시만 조회 (응답 경로에서 그래프 쿼리 없음)
+      캐시에 없으면 빈 결과를 돌려주고 백그라운드에서 미리 불러옴 (load_memory에서 prefetch)
+    - 워커 간 일관성: 저장 후 Redis pub/sub으로 사용자 목록을 알리면 다른 워커가 해당 캐시를 다시 불러옴.
+      알림을 놓치더라도 KNOWLEDGE_CACHE_TTL이 지난 캐시는 기존 값을 쓰면서 백그라운드에서 갱신
+    """
+    def __init__(self, backend: KnowledgeBackend, redis_client: Optional[redis.Redis] = None):
+        self.backend = backend
+        self.redis = redis_client
+        self.worker_id = uuid.uuid4().hex
+        self._pending: List[Tuple[str, Triple]] = []
+        self._flushing: List[Tuple[str, Triple]] = []        # upsert 중인 배치
+        self._cache: "OrderedDict[str, List[Triple]]" = OrderedDict()
+        self._loaded_at: Dict[str, float] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._load_buffer: Dict[str, List[Triple]] = {}      # 로드 도중 들어온 사실
+        self._writer: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncio.Task] = None
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # --- 쓰기 경로 ---
+    def enqueue(self, user_id: str, triples: List[Triple]):
+        if not triples:
+            return
+        self._pending.extend((user_id, t) for t in triples)
+        overflow = len(self._pending) - settings.KNOWLEDGE_MAX_PENDING
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            logger.warning(f"⚠️ 지식 그래프 큐 초과로 오래된 사실 {overflow}개 폐기")
+        # 캐시에 올라와 있는 사용자는 바로 반영하여 다음 턴부터 사용
+        if user_id in self._cache:
+            self._cache[user_id] = self._merge(self._cache[user_id], triples)
+        if user_id in self._load_buffer:
+            self._load_buffer[user_id].extend(triples)
+
+    async def flush(self) -> int:
+        """대기 중인 사실을 배치 단위로 저장. 실패하면 큐 앞쪽에 되돌려 다음 주기에 재시도"""
+        written = 0
+        users = set()
+        while self._pending:
+            batch = self._pending[:settings.KNOWLEDGE_FLUSH_BATCH]
+            del self._pending[:len(batch)]
+            self._flushing = batch
+            try:
+                await self.backend.upsert(batch)
+            except Exception as e:
+                self._pending[:0] = batch
+                self.failed_flushes += 1
+                logger.error(f"❌ 지식 그래프 저장 실패 ({len(batch)}건, 재시도 예정): {e}")
+                break
+            finally:
+                self._flushing = []
+            written += len(batch)
+            users.update(user_id for user_id, _ in batch)
+        self.flushed += written
+        if users:
+            await self._publish(users)
+        return written
+
+    async def _publish(self, users):
+        """저장된 사용자 목록을 다른 워커에 알림 (실패해도 KNOWLEDGE_CACHE_TTL로 결국 갱신됨)"""
+        if self.redis is None:
+            return
+        try:
+            await self.redis.publish(INVALIDATE_CHANNEL, json.dumps({"origin": self.worker_id, "users": sorted(users)}))
+        except Exception as e:
+            logger.warning(f"⚠️ 지식 그래프 캐시 갱신 알림 실패: {e}")
+
+    async def run_listener(self):
+        """다른 워커가 저장한 사용자의 캐시를 다시 불러옴 (연결이 끊기면 재구독)"""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATE_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.on_invalidation(message["data"])
+            except Exception as e:
+                logger.error(f"❌ 지식 그래프 캐시 갱신 구독 실패 (재시도 예정): {e}")
+                await asyncio.sleep(settings.KNOWLEDGE_FLUSH_INTERVAL)
+
+    def on_invalidation(self, raw: str):
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if data.get("origin") == self.worker_id:
+            return
+        for user_id in data.get("users", []):
+            self.invalidate(user_id)
+
+    async def run_writer(self):
+        while True:
+            await asyncio.sleep(settings.KNOWLEDGE_FLUSH_INTERVAL)
+            await self.flush()
+
+    async def start(self):
+        try:
+            await self.backend.setup()
+        except Exception as e:
+            logger.error(f"❌ 지식 그래프 백엔드 초기화 실패 (쓰기는 재시도됨): {e}")
+        self._writer = asyncio.create_task(self.run_writer())
+        if self.redis is not None:
+            self._listener = asyncio.create_task(self.run_listener())
+
+    async def close(self):
+        for task in (self._writer, self._listener):
+            if task:
+                task.cancel()
+        await self.flush()
+        await self.backend.close()
+
+    # --- 읽기 경로 ---
+    def facts(self, user_id: str) -> List[Triple]:
+        """캐시된 사실만 반환 (미스면 백그라운드 로드만 걸고 빈 결과, 오래된 캐시는 반환 후 백그라운드 갱신)"""
+        if user_id in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(user_id)
+            self.prefetch(user_id)
+            return self._cache[user_id]
+        self.cache_misses += 1
+        self.prefetch(user_id)
+        return []
+
+    def prefetch(self, user_id: Optional[str]):
+        """캐시에 없거나 KNOWLEDGE_CACHE_TTL이 지난 사용자를 백그라운드에서 불러옴"""
+        if not user_id or user_id in self._loading:
+            return
+        if user_id in self._cache and self._is_fresh(user_id):
+            return
+        self._loading[user_id] = asyncio.create_task(self._load(user_id))
+
+    def _is_fresh(self, user_id: str) -> bool:
+        loaded_at = self._loaded_at.get(user_id)
+        return loaded_at is not None and time.monotonic() - loaded_at < settings.KNOWLEDGE_CACHE_TTL
+
+    async def _load(self, user_id: str):
+        self._load_buffer[user_id] = []
+        try:
+            # 조회 도중 저장이 끝난 배치가 조회 결과와 큐 양쪽에서 빠지지 않도록 조회 전에 저장 전/중인 사실을 잡아둠
+            queued = [t for uid, t in self._flushing + self._pending if uid == user_id]
+            stored = await self.backend.fetch(user_id, settings.KNOWLEDGE_PROMPT_FACTS)
+            # 조회 도중 새로 들어온 사실도 함께 반영
+            self._cache[user_id] = self._merge(list(reversed(stored)), queued + self._load_buffer[user_id])
+            self._loaded_at[user_id] = time.monotonic()
+            while len(self._cache) > settings.KNOWLEDGE_CACHE_USERS:
+                evicted, _ = self._cache.popitem(last=False)
+                self._loaded_at.pop(evicted, None)
+        except Exception as e:
+            logger.error(f"❌ 지식 그래프 조회 실패 ({user_id}): {e}")
+        finally:
+            self._loading.pop(user_id, None)
+            self._load_buffer.pop(user_id, None)
+
+    def invalidate(self, user_id: str):
+        """다른 워커나 외부에서 그래프가 바뀐 경우 캐시된 사용자를 다시 불러옴 (갱신 전까지는 기존 캐시 사용)"""
+        if user_id in self._cache:
+            self._loaded_at.pop(user_id, None)
+            self.prefetch(user_id)
+
+    @staticmethod
+    def _merge(facts: List[Triple], new: List[Triple]) -> List[Triple]:
+        """오래된 것부터 최신 순으로 유지하며 중복은 최신 위치로 이동, 프롬프트용 개수만 보관"""
+        merged = [t for t in facts if t not in new] + list(dict.fromkeys(new))
+        return merged[-settings.KNOWLEDGE_PROMPT_FACTS:]
+
+    def stats(self) -> Dict[str, Any]:
+        reads = self.cache_hits + self.cache_misses
+        return {
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+            "cached_users": len(self._cache),
+            "cache_hit_ratio": round(self.cache_hits / reads, 3) if reads else 0.0
+        }
+
+knowledge_store = KnowledgeStore(
+    create_backend(),
+    redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True)
+)
@@ -0,0 +1,197 @@
+# src/supporter_ai/memory/session_store.py
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+import redis.asyncio as redis
+from sqlalchemy import create_engine, select, MetaData, Table, Column, String, Text, DateTime
+from sqlalchemy.dialects import postgresql, sqlite
+from supporter_ai.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_KEY = "supporter:context:{}"
+LAST_SEEN_KEY = "supporter:context:last_seen"   # session_id -> 마지막 저장 시각 (sorted set)
+
+metadata = MetaData()
+sessions_table = Table(
+    "supporter_sessions", metadata,
+    Column("session_id", String(128), primary_key=True),
+    Column("data", Text, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+# 유휴 판정 이후 다시 저장된 세션은 지우지 않도록 점수를 확인하며 원자적으로 삭제
+EVICT_IF_IDLE = """
+local evicted = 0
+for i = 3, #ARGV do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if score and tonumber(score) <= tonumber(ARGV[1]) then
+        redis.call('DEL', ARGV[2] .. ARGV[i])
+        redis.call('ZREM', KEYS[1], ARGV[i])
+        evicted = evicted + 1
+    end
+end
+return evicted
+"""
+
+def compact_session(data: Dict[str, Any]) -> Dict[str, Any]:
+    """콜드 저장 전 압축: 요약/설정은 유지하고 최근 메시지만 남김"""
+    return {
+        **data,
+        "messages": data.get("messages", [])[-settings.SESSION_COLD_MAX_MESSAGES:]
+    }
+
+class ColdSessionStore:
+    """PostgreSQL(테스트에서는 SQLite)에 유휴 세션을 보관하는 콜드 저장소. 동기 드라이버는 스레드에서 실행합니다."""
+    def __init__(self, url: str):
+        # PostgreSQL 장애 시 세션 로드가 오래 멈추지 않도록 연결 타임아웃 지정
+        connect_args = {"connect_timeout": 3} if url.startswith("postgresql") else {}
+        self.engine = create_engine(url, pool_pre_ping=True, connect_args=connect_args)
+
+    def create_tables(self):
+        metadata.create_all(self.engine)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(sessions_table.c.data).where(sessions_table.c.session_id == session_id)
+            ).first()
+        return json.loads(row.data) if row else None
+
+    def put_many(self, sessions: Dict[str, Dict[str, Any]]):
+        """여러 세션을 한 트랜잭션으로 upsert"""
+        if not sessions:
+            return
+        now = datetime.now(timezone.utc)
+        rows = [{"session_id": sid, "data": json.dumps(data), "updated_at": now} for sid, data in sessions.items()]
+        insert = postgresql.insert if self.engine.dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(sessions_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[sessions_table.c.session_id],
+            set_={"data": stmt.excluded.data, "updated_at": stmt.excluded.updated_at}
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt, rows)
+
+class TieredSessionStore:
+    """
+    세션 단기 기억의 2단 저장소.
+    - Hot (Redis): 활성 세션. 저장할 때마다 last_seen 갱신
+    - Cold (PostgreSQL): 일정 시간 유휴인 세션을 백그라운드 작업이 압축하여 일괄 이관
+    Redis에 없으면 콜드 저장소에서 읽어 Redis로 다시 올립니다 (lazy rehydrate).
+    콜드 저장소 초기화가 성공하기 전에는 콜드 조회와 last_seen 기록을 건너뛰고 Redis 전용으로 동작하며,
+    이관 작업이 주기마다 초기화를 다시 시도합니다.
+    """
+    def __init__(self, redis_client: redis.Redis, cold: ColdSessionStore):
+        self.redis = redis_client
+        self.cold = cold
+        self.cold_ready = False
+        self.hits = 0
+        self.misses = 0
+        self.rehydrates = 0
+        self.flushed = 0
+        self._rehydrate_latency: deque = deque(maxlen=500)
+
+    async def setup(self) -> bool:
+        """콜드 저장소 테이블 준비. 실패해도 예외 없이 False (Redis 전용으로 동작)"""
+        try:
+            await asyncio.to_thread(self.cold.create_tables)
+        except Exception as e:
+            logger.error(f"❌ 세션 콜드 저장소 연결 실패, Redis 전용으로 동작 (주기적으로 재시도): {e}")
+            return False
+        self.cold_ready = True
+        return True
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw_data = await self.redis.get(CONTEXT_KEY.format(session_id))
+        if raw_data:
+            self.hits += 1
+            return json.loads(raw_data)
+        if not self.cold_ready:
+            self.misses += 1
+            return None
+
+        start = time.perf_counter()
+        try:
+            data = await asyncio.to_thread(self.cold.get, session_id)
+        except Exception as e:
+            logger.error(f"❌ 콜드 세션 조회 실패 ({session_id}): {e}")
+            data = None
+        if data is None:
+            self.misses += 1
+            return None
+
+        await self.save(session_id, data)
+        self.rehydrates += 1
+        self._rehydrate_latency.append(time.perf_counter() - start)
+        logger.info(f"🧊 세션 {session_id} 콜드 저장소에서 복원.")
+        return data
+
+    async def save(self, session_id: str, data: Dict[str, Any]):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.setex(CONTEXT_KEY.format(session_id), settings.SESSION_HOT_TTL, json.dumps(data))
+            # 이관 작업이 돌 수 없을 때는 last_seen이 끝없이 쌓이지 않도록 기록하지 않음 (Redis TTL로만 만료)
+            if self.cold_ready:
+                pipe.zadd(LAST_SEEN_KEY, {session_id: time.time()})
+            await pipe.execute()
+
+    async def flush_idle(self, now: Optional[float] = None) -> int:
+        """SESSION_IDLE_SECONDS 이상 유휴인 세션을 압축해 콜드 저장소로 일괄 이관하고 Redis에서 제거"""
+        cutoff = (now or time.time()) - settings.SESSION_IDLE_SECONDS
+        total = 0
+        while True:
+            session_ids = await self.redis.zrangebyscore(
+                LAST_SEEN_KEY, "-inf", cutoff, start=0, num=settings.SESSION_FLUSH_BATCH
+            )
+            if not session_ids:
+                return total
+
+            raw_values = await self.redis.mget([CONTEXT_KEY.format(sid) for sid in session_ids])
+            sessions = {
+                sid: compact_session(json.loads(raw))
+                for sid, raw in zip(session_ids, raw_values) if raw
+            }
+            # 콜드 저장이 실패하면 Redis에서 지우지 않음 (다음 주기에 재시도)
+            await asyncio.to_thread(self.cold.put_many, sessions)
+            evicted = await self.redis.eval(
+                EVICT_IF_IDLE, 1, LAST_SEEN_KEY, cutoff, CONTEXT_KEY.format(""), *session_ids
+            )
+            total += evicted
+            self.flushed += evicted
+            if len(session_ids) < settings.SESSION_FLUSH_BATCH:
+                return total
+
+    async def run_flush_loop(self):
+        """lifespan에서 실행되는 주기적 이관 작업"""
+        while True:
+            await asyncio.sleep(settings.SESSION_FLUSH_INTERVAL)
+            if not self.cold_ready and not await self.setup():
+                continue
+            try:
+                flushed = await self.flush_idle()
+                if flushed:
+                    logger.info(f"🧊 유휴 세션 {flushed}개 콜드 저장소로 이관.")
+            except Exception as e:
+                logger.error(f"❌ 유휴 세션 이관 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.rehydrates + self.misses
+        latency = self._rehydrate_latency
+        return {
+            "hits": self.hits,
+            "rehydrates": self.rehydrates,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "flushed": self.flushed,
+            "rehydrate_avg_ms": round(sum(latency) / len(latency) * 1000, 1) if latency else 0.0,
+            "rehydrate_max_ms": round(max(latency) * 1000, 1) if latency else 0.0
+        }
+
+session_store = TieredSessionStore(
+    redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True),
+    ColdSessionStore(settings.POSTGRES_URL)
+)
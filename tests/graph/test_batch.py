@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from supporter_ai.graph.batch import run_batch
+
+class FakeGraph:
+    """ainvoke만 흉내내며 동시 실행 수와 세션별 실행 순서를 기록하는 가짜 그래프"""
+    checkpointer = None
+
+    def __init__(self, delay: float = 0.02, fail_on: str = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.running = 0
+        self.max_running = 0
+        self.order = {}
+
+    async def ainvoke(self, state, config=None):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if state["input_text"] == self.fail_on:
+                raise RuntimeError("LLM 오류 (테스트)")
+            self.order.setdefault(state["session_id"], []).append(state["input_text"])
+            history = state.get("messages", []) + [state["input_text"]]
+            return {**state, "messages": history, "final_output": {"text": f"re:{state['input_text']}"}}
+        finally:
+            self.running -= 1
+
+def make_states(n_sessions: int, turns: int):
+    return [
+        {"session_id": f"s{s}", "input_text": f"s{s}-t{t}", "messages": []}
+        for t in range(turns) for s in range(n_sessions)
+    ]
+
+async def test_batch_keeps_session_order_and_bounds_concurrency():
+    """세션 내 턴 순서는 유지하고, 요청별 동시 실행은 max_concurrency로 제한"""
+    graph = FakeGraph()
+    states = make_states(n_sessions=6, turns=3)
+
+    results = [r async for r in run_batch(graph, states, asyncio.Semaphore(8), max_concurrency=4)]
+
+    assert sorted(r["index"] for r in results) == list(range(len(states)))
+    assert graph.max_running == 4
+    for sid, turns in graph.order.items():
+        assert turns == [f"{sid}-t{t}" for t in range(3)]
+
+async def test_concurrent_batches_share_capacity():
+    """동시에 들어온 배치 요청들도 앱 전체 한도(capacity)를 넘지 않음"""
+    graph = FakeGraph()
+    capacity = asyncio.Semaphore(4)
+
+    async def consume(prefix: str):
+        states = [{**s, "session_id": prefix + s["session_id"]} for s in make_states(n_sessions=4, turns=2)]
+        return [r async for r in run_batch(graph, states, capacity)]
+
+    first, second = await asyncio.gather(consume("a"), consume("b"))
+
+    assert len(first) == len(second) == 8
+    assert graph.max_running == 4
+
+async def test_closing_stream_cancels_remaining_turns():
+    """스트림을 중간에 닫으면 남은 턴이 취소되고 정리까지 끝난 뒤 반환"""
+    graph = FakeGraph(delay=10)
+    stream = run_batch(graph, make_states(n_sessions=3, turns=1), asyncio.Semaphore(8))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(stream.__anext__(), timeout=0.05)
+    await stream.aclose()
+
+    assert graph.running == 0
+
+async def test_batch_carry_memory_between_turns():
+    """저장 노드 없는 평가 모드에서는 이전 턴 messages가 다음 턴 상태로 이어짐"""
+    graph = FakeGraph(delay=0)
+    states = make_states(n_sessions=1, turns=3)
+
+    results = {r["index"]: r async for r in run_batch(graph, states, asyncio.Semaphore(8), carry_memory=True)}
+
+    assert results[2]["state"]["messages"] == ["s0-t0", "s0-t1", "s0-t2"]
+
+async def test_batch_error_does_not_stop_session():
+    """한 턴이 실패해도 에러 결과를 내보내고 같은 세션의 다음 턴은 계속 실행"""
+    graph = FakeGraph(delay=0, fail_on="s0-t1")
+    states = make_states(n_sessions=1, turns=3)
+
+    results = {r["index"]: r async for r in run_batch(graph, states, asyncio.Semaphore(8))}
+
+    assert "error" in results[1]
+    assert results[2]["state"]["final_output"]["text"] == "re:s0-t2"
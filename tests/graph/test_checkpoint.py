@@ -0,0 +1,111 @@
+import time
+import uuid
+import asyncio
+from contextlib import AsyncExitStack
+import pytest
+import redis.asyncio as redis
+from supporter_ai.common.config import settings
+from supporter_ai.graph.workflow import create_supporter_workflow
+from supporter_ai.graph.checkpoint import redis_checkpointer, thread_config, run_turn
+from supporter_ai.memory.session_store import session_store
+
+FAKE_LLM_DELAY = 0.05
+FAKE_REPLY = (
+    '{"intent": "대화", "sentiment": "평온", "urgency": "normal", "thought": "단순 대화", '
+    '"tool_required": false, "type": "happy", "reason": "즐거움", "text": "안녕!", "emotion": "happy"}'
+)
+
+async def _redis_stack_available() -> bool:
+    """체크포인터는 RediSearch 모듈이 필요하므로 Redis Stack 여부까지 확인"""
+    client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, socket_connect_timeout=1)
+    try:
+        await client.ping()
+        modules = await client.execute_command("MODULE", "LIST")
+        return "search" in str(modules).lower()
+    except Exception:
+        return False
+    finally:
+        await client.aclose()
+
+@pytest.fixture
+async def fake_llm(mocker):
+    """LLM 호출을 지연만 흉내내는 가짜 응답으로 대체하고 노드별 호출 횟수를 기록"""
+    if not await _redis_stack_available():
+        pytest.skip("로컬 Redis Stack이 없어 체크포인트 테스트를 스킵합니다.")
+
+    calls = {"count": 0, "fail_on": None}
+
+    async def fake_safe_llm_call(llm, messages, max_retries=5, usage=None):
+        calls["count"] += 1
+        if calls["fail_on"] and calls["fail_on"] in messages[0].content:
+            calls["fail_on"] = None
+            raise RuntimeError("vLLM 연결 끊김 (테스트)")
+        await asyncio.sleep(FAKE_LLM_DELAY)
+        return FAKE_REPLY
+
+    mocker.patch("supporter_ai.graph.nodes.brain.reasoning.safe_llm_call", side_effect=fake_safe_llm_call)
+    # 테스트마다 이벤트 루프가 달라지므로 세션 저장소의 Redis 클라이언트도 새로 생성
+    client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True)
+    mocker.patch.object(session_store, "redis", client)
+    yield calls
+    await client.aclose()
+
+async def test_failed_turn_resumes_on_another_worker(fake_llm):
+    """워커 A에서 감정 노드 실패 -> 워커 B가 같은 세션 턴을 완료된 노드 이후부터 재개"""
+    session_id = f"test_ckpt_{uuid.uuid4().hex[:8]}"
+    state = {
+        "input_text": "안녕", "user_id": "tester", "session_id": session_id, "blood_type": "A",
+        "enabled_tools": [], "disabled_tools": [], "messages": [], "search_results": "", "final_output": {}
+    }
+    config = thread_config(session_id)
+
+    async with redis_checkpointer() as saver_a, redis_checkpointer() as saver_b:
+        worker_a = await create_supporter_workflow(checkpointer=saver_a)
+        worker_b = await create_supporter_workflow(checkpointer=saver_b)
+
+        fake_llm["fail_on"] = "성격 모델러"  # emotion_node 시스템 프롬프트
+        with pytest.raises(RuntimeError):
+            await run_turn(worker_a, state, config)
+        calls_before_retry = fake_llm["count"]  # sensory + orchestrator + 실패한 emotion
+
+        final_state = await run_turn(worker_b, state, config)
+
+    assert final_state["final_output"]["text"] == "안녕!"
+    # 재시도에서는 emotion + expression만 다시 호출되어야 함 (sensory/orchestrator 재실행 없음)
+    assert fake_llm["count"] - calls_before_retry == 2
+
+async def test_multi_worker_throughput(fake_llm):
+    """여러 워커가 하나의 Redis 체크포인터를 공유하며 세션 턴을 나눠 처리하는 처리량 측정"""
+    n_workers, n_sessions, turns_per_session = 4, 16, 3
+    prefix = f"test_tp_{uuid.uuid4().hex[:8]}"
+
+    async with AsyncExitStack() as stack:
+        # 워커마다 독립된 체크포인터 연결로 컴파일 (별도 uvicorn 워커 흉내)
+        workers = []
+        for _ in range(n_workers):
+            saver = await stack.enter_async_context(redis_checkpointer())
+            workers.append(await create_supporter_workflow(checkpointer=saver))
+
+        async def run_session(idx: int):
+            session_id = f"{prefix}_{idx}"
+            for turn in range(turns_per_session):
+                # 턴마다 다른 워커에 배정 (라운드로빈 로드밸런서 흉내)
+                worker = workers[(idx + turn) % n_workers]
+                state = {
+                    "input_text": f"메시지 {turn}", "user_id": "tester", "session_id": session_id,
+                    "blood_type": "O", "enabled_tools": [], "disabled_tools": [], "messages": [],
+                    "search_results": "", "final_output": {}
+                }
+                final_state = await run_turn(worker, state, thread_config(session_id))
+                assert final_state["final_output"]["text"] == "안녕!"
+            return final_state
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(run_session(i) for i in range(n_sessions)))
+        elapsed = time.perf_counter() - start
+
+    total_turns = n_sessions * turns_per_session
+    print(f"\n[처리량] 워커 {n_workers}개, {total_turns}턴: {elapsed:.2f}s ({total_turns / elapsed:.1f} turns/s)")
+    assert len(results) == n_sessions
+    # 턴마다 워커가 바뀌어도 세션 히스토리는 이어져야 함 (턴당 user/ai 메시지 2개)
+    assert all(len(r["messages"]) == turns_per_session * 2 for r in results)
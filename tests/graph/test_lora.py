@@ -0,0 +1,186 @@
+import json
+import asyncio
+import httpx
+import pytest
+from supporter_ai.common.config import settings
+from langchain_openai import ChatOpenAI
+from supporter_ai.graph.nodes.brain import reasoning
+from supporter_ai.graph.nodes.brain.lora import AdapterScheduler, LoraManager
+
+async def run_requests(scheduler: AdapterScheduler, adapters, delay: float = 0.02):
+    """어댑터별 요청을 동시에 넣고 실제 실행(진입) 순서를 반환"""
+    order = []
+
+    async def call(adapter: str):
+        async with scheduler.slot(adapter):
+            order.append(adapter)
+            await asyncio.sleep(delay)
+
+    await asyncio.gather(*(call(a) for a in adapters))
+    return order
+
+async def test_scheduler_groups_interleaved_adapters():
+    """A/B/O/AB가 섞여 들어와도 어댑터별로 묶여 실행되어 전환 횟수가 최소화됨"""
+    scheduler = AdapterScheduler(window_ms=10)
+    order = await run_requests(scheduler, ["A", "B", "O", "AB"] * 3)
+
+    # 같은 어댑터 요청은 연속으로 실행
+    groups = [a for i, a in enumerate(order) if i == 0 or order[i - 1] != a]
+    assert groups == ["A", "B", "O", "AB"]
+    assert scheduler.switches == 3
+    assert scheduler.inflight == 0 and scheduler.active is None
+
+async def test_scheduler_disabled_with_zero_window():
+    """window=0이면 스케줄링 없이 들어온 순서대로 바로 실행"""
+    scheduler = AdapterScheduler(window_ms=0)
+    order = await run_requests(scheduler, ["A", "B", "A", "B"])
+    assert order == ["A", "B", "A", "B"]
+
+async def test_scheduler_cancelled_waiter_does_not_block():
+    """대기 중 취소된 요청이 있어도 다음 그룹이 정상적으로 실행됨"""
+    scheduler = AdapterScheduler(window_ms=5)
+    waiter = asyncio.create_task(run_requests(scheduler, ["B"]))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    order = await run_requests(scheduler, ["A", "A"])
+    assert order == ["A", "A"]
+
+async def test_scheduler_caps_group_hold_time():
+    """느린 호출이 있어도 max_hold가 지나면 다른 어댑터 그룹이 기다리지 않고 실행됨"""
+    scheduler = AdapterScheduler(window_ms=5, max_hold_ms=20)
+    started = {}
+
+    async def call(adapter: str, delay: float):
+        async with scheduler.slot(adapter):
+            started[adapter] = asyncio.get_running_loop().time()
+            await asyncio.sleep(delay)
+
+    slow = asyncio.create_task(call("A", 0.5))
+    await asyncio.sleep(0.05)
+    await asyncio.wait_for(call("B", 0), timeout=0.2)
+
+    assert started["B"] - started["A"] < 0.2
+    await slow
+    assert scheduler.inflight == 0 and scheduler.active is None
+
+def vllm_handler(missing=(), already_loaded=()):
+    """load_lora_adapter / chat/completions 응답을 흉내내는 vLLM 목 핸들러"""
+    def handler(request: httpx.Request):
+        body = request.content.decode()
+        if request.url.path.endswith("/load_lora_adapter"):
+            if any(f"adapter_{b}" in body for b in missing):
+                return httpx.Response(400, text="No adapter found")
+            if any(f"adapter_{b}" in body for b in already_loaded):
+                return httpx.Response(400, text="The lora adapter has already been loaded.")
+            return httpx.Response(200, text="Success")
+        return httpx.Response(200, json={})
+    return handler
+
+async def test_warm_up_marks_missing_and_falls_back(mocker):
+    """등록에 실패한 어댑터는 missing으로 표시되고 베이스 모델(None)로 대체 (이미 로드된 어댑터는 정상)"""
+    handler = vllm_handler(missing=["AB"], already_loaded=["B"])
+
+    mocker.patch.object(settings, "LORA_FALLBACK_TO_BASE", True)
+    manager = LoraManager()
+    async with httpx.AsyncClient(base_url="http://vllm/v1", transport=httpx.MockTransport(handler)) as client:
+        await manager.warm_up(client)
+
+    assert manager.status == {"A": "warm", "B": "warm", "O": "warm", "AB": "missing"}
+    assert manager.resolve("A") == "A"
+    assert manager.resolve("AB") is None
+
+    mocker.patch.object(settings, "LORA_FALLBACK_TO_BASE", False)
+    assert manager.resolve("AB") == "AB"
+
+async def test_warm_up_uses_adapter_as_model():
+    """웜업 생성 요청은 어댑터 이름을 model로 보내 실제 서빙 여부를 확인"""
+    models = []
+
+    def handler(request: httpx.Request):
+        if request.url.path.endswith("/chat/completions"):
+            models.append(json.loads(request.content)["model"])
+            if models[-1] == "adapter_O":
+                return httpx.Response(404, json={"error": "model not found"})
+        return httpx.Response(200, text="Success")
+
+    manager = LoraManager(["A", "O"])
+    async with httpx.AsyncClient(base_url="http://vllm/v1", transport=httpx.MockTransport(handler)) as client:
+        await manager.warm_up(client)
+
+    assert sorted(models) == ["adapter_A", "adapter_O"]
+    assert manager.status == {"A": "warm", "O": "missing"}
+
+async def test_failed_warm_up_is_retried_after_backoff(mocker):
+    """vLLM 연결 실패는 cold로 남고, 재시도 간격이 지나면 resolve가 다시 웜업"""
+    def unreachable(request: httpx.Request):
+        raise httpx.ConnectError("connection refused")
+
+    mocker.patch.object(settings, "LORA_FALLBACK_TO_BASE", True)
+    mocker.patch.object(settings, "LORA_RETRY_SECONDS", 0)
+    manager = LoraManager(["A"])
+    async with httpx.AsyncClient(base_url="http://vllm/v1", transport=httpx.MockTransport(unreachable)) as client:
+        await manager.warm_up(client)
+    assert manager.status == {"A": "cold"}
+
+    healthy = httpx.AsyncClient(base_url="http://vllm/v1", transport=httpx.MockTransport(vllm_handler()))
+    mocker.patch("supporter_ai.graph.nodes.brain.lora._vllm_client", return_value=healthy)
+    assert manager.resolve("A") is None
+    await manager._warming["A"]
+
+    assert manager.status == {"A": "warm"}
+    assert manager.resolve("A") == "A"
+
+async def test_missing_adapter_waits_for_backoff(mocker):
+    """재시도 간격 전에는 missing 어댑터의 웜업을 다시 시작하지 않음"""
+    mocker.patch.object(settings, "LORA_FALLBACK_TO_BASE", True)
+    mocker.patch.object(settings, "LORA_RETRY_SECONDS", 60)
+    manager = LoraManager(["AB"])
+    async with httpx.AsyncClient(base_url="http://vllm/v1", transport=httpx.MockTransport(vllm_handler(missing=["AB"]))) as client:
+        await manager.warm_up(client)
+
+    assert manager.resolve("AB") is None
+    assert "AB" not in manager._warming
+
+async def test_expression_call_uses_adapter_as_model(mocker):
+    """웜업된 어댑터의 expression 호출은 웜업 확인과 같이 어댑터 이름을 model로 보냄"""
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "id": "cmpl", "object": "chat.completion", "created": 0, "model": requests[-1]["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": '{"text": "안녕", "emotion": "happy"}'}}]
+        })
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    mocker.patch.object(reasoning, "ChatOpenAI", lambda **kwargs: ChatOpenAI(http_async_client=client, **kwargs))
+    manager = LoraManager()
+    manager.status["B"] = "warm"
+    mocker.patch.object(reasoning, "lora_manager", manager)
+    mocker.patch.object(reasoning.knowledge_store, "facts", return_value=[])
+
+    state = {"input_text": "안녕", "blood_type": "B", "messages": [], "summary": ""}
+    assert (await reasoning.generate_expression(state))["text"] == "안녕"
+    manager.status["B"] = "missing"
+    mocker.patch.object(settings, "LORA_FALLBACK_TO_BASE", True)
+    manager._retry_at["B"] = float("inf")  # 재웜업 없이 베이스 모델로 대체
+    await reasoning.generate_expression(state)
+
+    assert [r["model"] for r in requests] == ["adapter_B", settings.LLM_MODEL_NAME]
+    assert all("lora_request" not in r for r in requests)
+    await client.aclose()
+
+def test_latency_stats_per_adapter():
+    """어댑터별 호출 수와 지연 시간이 따로 집계됨 (베이스 모델은 'base')"""
+    manager = LoraManager()
+    for latency in (0.1, 0.2, 0.3):
+        manager.record("A", latency, wait=0.01)
+    manager.record(None, 0.5)
+
+    stats = manager.stats()
+    assert stats["A"]["calls"] == 3
+    assert stats["A"]["avg_ms"] == pytest.approx(200.0)
+    assert stats["A"]["p95_ms"] == pytest.approx(300.0)
+    assert stats["base"]["calls"] == 1
+    assert stats["B"]["calls"] == 0
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from supporter_ai.common.config import settings
+from supporter_ai.graph.workflow import create_supporter_workflow
+from supporter_ai.graph.checkpoint import thread_config, run_turn
+from supporter_ai.graph.nodes.brain.speculation import SpeculationTracker
+
+FAKE_LLM_DELAY = 0.05
+
+@pytest.fixture
+def fake_llm(mocker):
+    """시스템 프롬프트로 노드를 구분해 응답하는 가짜 LLM (expression은 토큰 10개 사용으로 기록)"""
+    mocker.patch.object(settings, "LORA_FALLBACK_TO_BASE", False)
+    tracker = SpeculationTracker()
+    mocker.patch("supporter_ai.graph.nodes.brain.reasoning.speculation_tracker", tracker)
+    mocker.patch("supporter_ai.graph.checkpoint.speculation_tracker", tracker)
+
+    async def fake_safe_llm_call(llm, messages, max_retries=5, usage=None):
+        await asyncio.sleep(FAKE_LLM_DELAY)
+        sys, prompt = messages[0].content, messages[-1].content
+        if "실패" in prompt:
+            raise RuntimeError("LLM 오류 (테스트)")
+        if "도구 사용 판단관" in sys:
+            return '{"thought": "판단", "tool_required": %s}' % ("true" if "검색" in prompt else "false")
+        if "친구야" in sys:
+            if usage is not None:
+                usage["total_tokens"] = usage.get("total_tokens", 0) + 10
+            text = "검색결과 반영" if "참고정보" in sys else "그냥 대답"
+            return '{"text": "%s", "emotion": "happy"}' % text
+        return '{"intent": "대화", "sentiment": "평온", "type": "happy", "reason": "즐거움"}'
+
+    mocker.patch("supporter_ai.graph.nodes.brain.reasoning.safe_llm_call", side_effect=fake_safe_llm_call)
+    return tracker
+
+def make_state(text: str):
+    return {
+        "input_text": text, "user_id": "tester", "session_id": "spec", "blood_type": "A",
+        "enabled_tools": ["google_search"], "disabled_tools": [], "messages": [], "search_results": "", "final_output": {}
+    }
+
+async def test_speculation_hit_without_tool(fake_llm):
+    """도구가 필요 없으면 분석과 병렬로 생성한 결과를 그대로 사용"""
+    graph = await create_supporter_workflow(persist=False, speculative=True)
+    final_state = await graph.ainvoke(make_state("안녕"))
+
+    assert final_state["final_output"]["text"] == "그냥 대답"
+    stats = fake_llm.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 0
+    # 분석 3단계 동안 expression 생성이 끝나 있었으므로 생성 시간 전체가 절약됨
+    assert stats["saved_ms"] >= FAKE_LLM_DELAY * 1000 * 0.9
+
+async def test_speculation_discarded_when_tool_selected(fake_llm):
+    """도구가 선택되면 추측 결과를 버리고 검색 결과를 반영해 다시 생성"""
+    graph = await create_supporter_workflow(persist=False, speculative=True)
+    final_state = await graph.ainvoke(make_state("날씨 검색해줘"))
+
+    assert final_state["final_output"]["text"] == "검색결과 반영"
+    stats = fake_llm.stats()
+    assert stats["hits"] == 0 and stats["misses"] == 1
+    # sensory+orchestrator 동안 추측 생성이 끝났으므로 토큰 낭비가 집계됨
+    assert stats["wasted_tokens"] == 10
+
+async def test_non_speculative_graph_does_not_speculate(fake_llm):
+    graph = await create_supporter_workflow(persist=False)
+    final_state = await graph.ainvoke(make_state("안녕"))
+
+    assert final_state["final_output"]["text"] == "그냥 대답"
+    assert fake_llm.stats()["hits"] == 0
+
+async def test_discard_cancels_inflight_speculation():
+    """생성 도중 취소되면 작업이 취소되고 취소 횟수로 기록"""
+    tracker = SpeculationTracker()
+
+    async def slow_generate(usage):
+        await asyncio.sleep(10)
+
+    key = tracker.start(slow_generate)
+    await asyncio.sleep(0)
+    tracker.discard(key)
+    await asyncio.sleep(0)
+
+    assert tracker.stats()["cancelled_inflight"] == 1
+    assert await tracker.take(key) is None
+
+async def test_failed_turn_cancels_speculation(fake_llm):
+    """추측 시작 후 턴이 실패하면 run_turn이 추측을 취소하고 miss로 집계"""
+    graph = await create_supporter_workflow(persist=False, speculative=True)
+    with pytest.raises(RuntimeError):
+        await run_turn(graph, make_state("실패"), thread_config("spec"))
+
+    stats = fake_llm.stats()
+    assert stats["hits"] == 0 and stats["misses"] == 1
+    assert fake_llm._running == {}
+
+async def test_unclaimed_speculation_expires_as_miss(mocker):
+    """턴 종료 시 정리되지 않은 추측도 SPECULATION_TTL이 지나면 취소되고 miss로 집계"""
+    mocker.patch("supporter_ai.graph.nodes.brain.speculation.SPECULATION_TTL", 0.01)
+    tracker = SpeculationTracker()
+
+    async def slow_generate(usage):
+        await asyncio.sleep(10)
+
+    tracker.start(slow_generate)
+    await asyncio.sleep(0.05)
+
+    stats = tracker.stats()
+    assert stats["misses"] == 1 and stats["cancelled_inflight"] == 1
+    assert tracker._running == {}
@@ -0,0 +1,87 @@
+import json
+import httpx
+import pytest
+from typing import TypedDict
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+from langgraph.graph import StateGraph, START, END
+from supporter_ai.graph.nodes.brain import reasoning
+from supporter_ai.graph.streaming import TextFieldStreamer
+
+def stream(chunks):
+    streamer = TextFieldStreamer()
+    return [streamer.feed(c) for c in chunks]
+
+def test_extracts_text_field_progressively():
+    chunks = ['{"te', 'xt": "안녕', ' 친구', '야", "emo', 'tion": "happy"}']
+    out = stream(chunks)
+    assert "".join(out) == "안녕 친구야"
+    # 토큰이 들어오는 대로 바로 나와야 함
+    assert out[1] == "안녕"
+
+def test_handles_escapes_split_across_chunks():
+    raw = json.dumps({"text": '줄바꿈\n따옴표"끝 좋아 😀', "emotion": "happy"}, ensure_ascii=True)
+    # 한 글자씩 흘려보내도 이스케이프(서로게이트 쌍 포함)가 올바르게 복원됨
+    text = "".join(stream(list(raw)))
+    assert text == '줄바꿈\n따옴표"끝 좋아 😀'
+    text.encode("utf-8")
+
+    # 서로게이트 쌍이 두 청크로 나뉘어 들어와도 한 글자로 합쳐짐
+    raw = json.dumps({"text": "좋아 😀"})
+    split = raw.index("\\ude00")
+    assert "".join(stream([raw[:split], raw[split:]])) == "좋아 😀"
+
+def test_drops_unpaired_surrogate():
+    raw = '{"text": "a\\ud83db\\ude00c"}'
+    assert "".join(stream([raw])) == "abc"
+
+def test_plain_text_response_passes_through():
+    assert "".join(stream(["그냥 ", "문장으로 ", "대답"])) == "그냥 문장으로 대답"
+
+def test_code_fenced_json():
+    assert "".join(stream(['```json\n{"text": "', '반가워', '"}\n```'])) == "반가워"
+
+def sse_handler(request: httpx.Request):
+    """스트리밍 요청에 SSE로 응답하고, include_usage를 요청한 경우에만 사용량 청크를 붙이는 vLLM 목"""
+    body = json.loads(request.content)
+    chunks = [
+        {"choices": [{"index": 0, "delta": {"role": "assistant", "content": "안녕"}, "finish_reason": None}]},
+        {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    ]
+    if body.get("stream_options", {}).get("include_usage"):
+        chunks.append({"choices": [], "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}})
+    events = "".join(
+        f"data: {json.dumps({'id': 'c', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model'], **c})}\n\n"
+        for c in chunks
+    )
+    return httpx.Response(200, text=events + "data: [DONE]\n\n", headers={"content-type": "text/event-stream"})
+
+async def test_streamed_llm_calls_report_usage(mocker):
+    """messages 모드로 스트리밍되는 그래프(/chat/stream)에서도 LLM 호출의 토큰 사용량이 집계됨"""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(sse_handler))
+    mocker.patch.object(reasoning, "ChatOpenAI", lambda **kwargs: ChatOpenAI(http_async_client=client, **kwargs))
+
+    class State(TypedDict, total=False):
+        tokens: int
+
+    async def node(state: State):
+        usage = {}
+        await reasoning.safe_llm_call(reasoning.get_llm(), [HumanMessage(content="안녕")], usage=usage)
+        return {"tokens": usage.get("total_tokens", 0)}
+
+    workflow = StateGraph(State)
+    workflow.add_node("expression", node)
+    workflow.add_edge(START, "expression")
+    workflow.add_edge("expression", END)
+    graph = workflow.compile()
+
+    final_state, streamed = {}, []
+    async for mode, chunk in graph.astream({}, stream_mode=["messages", "values"]):
+        if mode == "values":
+            final_state = chunk
+        else:
+            streamed.append(chunk[0].content)
+
+    assert "안녕" in streamed
+    assert final_state["tokens"] == 10
+    await client.aclose()
@@ -0,0 +1,154 @@
+import json
+import asyncio
+import pytest
+from supporter_ai.common.config import settings
+from supporter_ai.graph.nodes.tools import memory
+from supporter_ai.memory.knowledge import (
+    InMemoryKnowledgeBackend, KnowledgeStore, Triple, extract_triples, create_backend
+)
+
+class FailingBackend(InMemoryKnowledgeBackend):
+    """처음 n번은 저장에 실패하는 백엔드 (Neo4j 장애 흉내)"""
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def upsert(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("neo4j unavailable")
+        await super().upsert(rows)
+
+@pytest.fixture
+def store():
+    return KnowledgeStore(InMemoryKnowledgeBackend())
+
+def test_extract_triples_filters_malformed_facts():
+    raw = [["민수", "친구", "나"], {"subject": "나", "relation": "좋아함", "object": "고양이"}, ["불완전"], "문자열", ["a", "", "b"]]
+    assert extract_triples(raw) == [Triple("민수", "친구", "나"), Triple("나", "좋아함", "고양이")]
+    assert extract_triples(None) == []
+
+def test_create_backend_selects_in_memory():
+    assert isinstance(create_backend("memory"), InMemoryKnowledgeBackend)
+    with pytest.raises(ValueError):
+        create_backend("unknown")
+
+async def test_write_behind_batches_upserts(store, mocker):
+    """큐에 쌓인 사실은 flush 때 배치 크기 단위로 묶여 저장됨"""
+    mocker.patch.object(settings, "KNOWLEDGE_FLUSH_BATCH", 2)
+    store.enqueue("u1", [Triple("민수", "친구", "나"), Triple("나", "좋아함", "고양이")])
+    store.enqueue("u2", [Triple("지수", "동생", "나")])
+    assert store.backend.upsert_calls == 0
+
+    assert await store.flush() == 3
+    assert store.backend.upsert_calls == 2
+    assert store.backend.graph["u1"][-1] == Triple("나", "좋아함", "고양이")
+    assert store.stats()["pending"] == 0
+
+async def test_failed_flush_is_retried(mocker):
+    store = KnowledgeStore(FailingBackend(failures=1))
+    store.enqueue("u1", [Triple("민수", "친구", "나")])
+
+    assert await store.flush() == 0
+    assert store.stats()["pending"] == 1 and store.stats()["failed_flushes"] == 1
+    assert await store.flush() == 1
+    assert store.backend.graph["u1"] == [Triple("민수", "친구", "나")]
+
+async def test_reads_served_from_cache_without_backend_query(store):
+    """미스면 빈 결과 + 백그라운드 로드, 이후에는 그래프 조회 없이 캐시에서 응답"""
+    await store.backend.upsert([("u1", Triple("민수", "친구", "나"))])
+
+    assert store.facts("u1") == []
+    await asyncio.sleep(0)  # prefetch 완료 대기
+    assert store.facts("u1") == [Triple("민수", "친구", "나")]
+    assert store.facts("u1") == [Triple("민수", "친구", "나")]
+    assert store.backend.fetch_calls == 1
+
+async def test_enqueue_updates_cached_user_immediately(store):
+    store.prefetch("u1")
+    await asyncio.sleep(0)
+    store.enqueue("u1", [Triple("나", "좋아함", "고양이")])
+
+    # 아직 저장 전이어도 다음 턴 프롬프트에 반영
+    assert store.facts("u1") == [Triple("나", "좋아함", "고양이")]
+    assert store.backend.graph == {}
+
+async def test_invalidate_reloads_from_backend(store):
+    store.prefetch("u1")
+    await asyncio.sleep(0)
+    await store.backend.upsert([("u1", Triple("지수", "동생", "나"))])  # 외부에서 그래프 변경
+    assert store.facts("u1") == []
+
+    store.invalidate("u1")
+    store.facts("u1")
+    await asyncio.sleep(0)
+    assert store.facts("u1") == [Triple("지수", "동생", "나")]
+
+async def test_stale_cache_refreshed_in_background(store, mocker):
+    """KNOWLEDGE_CACHE_TTL이 지난 캐시는 기존 값을 돌려주면서 백그라운드에서 다시 불러옴"""
+    store.prefetch("u1")
+    await asyncio.sleep(0)
+    await store.backend.upsert([("u1", Triple("지수", "동생", "나"))])  # 다른 워커가 저장
+
+    mocker.patch.object(settings, "KNOWLEDGE_CACHE_TTL", 0)
+    assert store.facts("u1") == []
+    await asyncio.sleep(0)
+    assert store.facts("u1") == [Triple("지수", "동생", "나")]
+
+async def test_invalidation_from_other_worker(store, mocker):
+    """다른 워커의 저장 알림은 캐시를 다시 불러오고, 자기 자신의 알림은 무시"""
+    store.redis = mocker.AsyncMock()
+    store.prefetch("u1")
+    await asyncio.sleep(0)
+    store.enqueue("u1", [Triple("민수", "친구", "나")])
+    await store.flush()
+
+    channel, raw = store.redis.publish.call_args.args
+    assert json.loads(raw)["users"] == ["u1"]
+    store.on_invalidation(raw)
+    assert "u1" not in store._loading
+
+    await store.backend.upsert([("u1", Triple("지수", "동생", "나"))])
+    store.on_invalidation(json.dumps({"origin": "other-worker", "users": ["u1", "u2"]}))
+    await asyncio.sleep(0)
+    assert store.facts("u1")[-1] == Triple("지수", "동생", "나")
+    assert "u2" not in store._cache
+
+async def test_load_keeps_facts_flushed_during_fetch(store):
+    """조회 도중 저장된 배치와 새로 들어온 사실이 캐시에서 빠지지 않음"""
+    fetched = asyncio.Event()
+    release = asyncio.Event()
+    fetch = store.backend.fetch
+
+    async def slow_fetch(user_id, limit):
+        result = await fetch(user_id, limit)  # 저장 전 그래프를 읽은 상태
+        fetched.set()
+        await release.wait()
+        return result
+
+    store.backend.fetch = slow_fetch
+    store.enqueue("u1", [Triple("민수", "친구", "나")])
+    store.prefetch("u1")
+    await fetched.wait()
+    await store.flush()
+    store.enqueue("u1", [Triple("나", "좋아함", "고양이")])
+    release.set()
+    await asyncio.sleep(0)
+
+    assert store.facts("u1") == [Triple("민수", "친구", "나"), Triple("나", "좋아함", "고양이")]
+
+async def test_eval_summarize_does_not_record_facts(store, mocker):
+    """평가용 그래프(persist=False)의 summarize는 요약만 하고 지식 그래프 큐에 넣지 않음"""
+    mocker.patch.object(memory, "knowledge_store", store)
+    mocker.patch(
+        "supporter_ai.graph.nodes.brain.reasoning.safe_llm_call",
+        return_value='{"summary": "민수와 친함", "facts": [["민수", "친구", "나"]]}'
+    )
+    state = {"user_id": "u1", "summary": "", "messages": [f"m{i}" for i in range(12)]}
+
+    result = await memory.summarize_eval_node(state)
+    assert result["summary"] == "민수와 친함"
+    assert store.stats()["pending"] == 0
+
+    await memory.summarize_node(state)
+    assert store.stats()["pending"] == 1
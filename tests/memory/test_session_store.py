@@ -0,0 +1,108 @@
+import time
+import uuid
+import asyncio
+import pytest
+import redis.asyncio as redis
+from supporter_ai.common.config import settings
+from supporter_ai.memory import session_store
+from supporter_ai.memory.session_store import ColdSessionStore, TieredSessionStore, compact_session
+
+@pytest.fixture
+def cold_store(tmp_path):
+    """PostgreSQL 대신 SQLite 파일을 사용하는 콜드 저장소"""
+    store = ColdSessionStore(f"sqlite:///{tmp_path / 'sessions.db'}")
+    store.create_tables()
+    return store
+
+TEST_PREFIX = f"test:{uuid.uuid4().hex[:8]}"
+CONTEXT_KEY = TEST_PREFIX + ":context:{}"
+LAST_SEEN_KEY = TEST_PREFIX + ":last_seen"
+
+@pytest.fixture
+async def tiered_store(cold_store, mocker):
+    # 로컬 Redis의 실제 세션이 이관되지 않도록 테스트 전용 키 사용
+    mocker.patch.object(session_store, "CONTEXT_KEY", CONTEXT_KEY)
+    mocker.patch.object(session_store, "LAST_SEEN_KEY", LAST_SEEN_KEY)
+    client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True, socket_connect_timeout=1)
+    try:
+        await client.ping()
+    except Exception:
+        pytest.skip("로컬 Redis가 없어 계층 저장소 테스트를 스킵합니다.")
+    store = TieredSessionStore(client, cold_store)
+    assert await store.setup()
+    yield store
+    await client.aclose()
+
+def make_session(n_messages: int):
+    return {
+        "messages": [{"type": "human", "data": {"content": f"m{i}"}} for i in range(n_messages)],
+        "summary": "고양이를 좋아함",
+        "blood_type": "B"
+    }
+
+def test_cold_store_bulk_upsert(cold_store):
+    """여러 세션을 한 번에 저장하고, 같은 세션은 최신 값으로 덮어씀"""
+    cold_store.put_many({"s1": make_session(2), "s2": make_session(3)})
+    cold_store.put_many({"s1": {**make_session(1), "summary": "강아지를 좋아함"}})
+
+    assert cold_store.get("s1")["summary"] == "강아지를 좋아함"
+    assert len(cold_store.get("s2")["messages"]) == 3
+    assert cold_store.get("unknown") is None
+
+def test_compact_keeps_summary_and_recent_messages(mocker):
+    mocker.patch.object(settings, "SESSION_COLD_MAX_MESSAGES", 4)
+    compacted = compact_session(make_session(10))
+
+    assert [m["data"]["content"] for m in compacted["messages"]] == ["m6", "m7", "m8", "m9"]
+    assert compacted["summary"] == "고양이를 좋아함"
+    assert compacted["blood_type"] == "B"
+
+async def test_idle_session_flushed_and_rehydrated(tiered_store):
+    """유휴 세션은 콜드 저장소로 이관된 뒤 Redis에서 빠지고, 다음 로드 때 다시 Redis로 복원"""
+    session_id = "s1"
+    await tiered_store.save(session_id, make_session(2))
+
+    # 아직 유휴 기준 전이면 이관 대상 아님
+    assert await tiered_store.flush_idle() == 0
+
+    flushed = await tiered_store.flush_idle(now=time.time() + settings.SESSION_IDLE_SECONDS + 1)
+    assert flushed == 1
+    assert not await tiered_store.redis.exists(CONTEXT_KEY.format(session_id))
+    assert await tiered_store.redis.zscore(LAST_SEEN_KEY, session_id) is None
+
+    data = await tiered_store.load(session_id)
+    assert data["summary"] == "고양이를 좋아함"
+    assert await tiered_store.redis.exists(CONTEXT_KEY.format(session_id))
+
+    await tiered_store.load(session_id)
+    stats = tiered_store.stats()
+    assert stats["rehydrates"] == 1 and stats["hits"] == 1
+    assert stats["rehydrate_avg_ms"] > 0
+
+    await tiered_store.redis.delete(CONTEXT_KEY.format(session_id), LAST_SEEN_KEY)
+
+async def test_new_session_counts_as_miss(tiered_store):
+    assert await tiered_store.load("new_session") is None
+    assert tiered_store.stats()["misses"] == 1
+
+async def test_unavailable_cold_store_is_skipped(tiered_store, tmp_path, mocker):
+    """콜드 저장소 초기화에 실패하면 콜드 조회와 last_seen 기록을 건너뛰고, 이관 작업이 초기화를 재시도"""
+    tiered_store.cold = ColdSessionStore(f"sqlite:///{tmp_path / 'missing' / 'sessions.db'}")
+    tiered_store.cold_ready = False
+    assert not await tiered_store.setup()
+    cold_get = mocker.spy(tiered_store.cold, "get")
+
+    assert await tiered_store.load("s1") is None
+    await tiered_store.save("s1", make_session(1))
+    assert cold_get.call_count == 0
+    assert await tiered_store.redis.zscore(LAST_SEEN_KEY, "s1") is None
+
+    # 다음 이관 주기에서 콜드 저장소가 살아나면 정상 동작으로 복귀
+    tiered_store.cold = ColdSessionStore(f"sqlite:///{tmp_path / 'sessions_retry.db'}")
+    mocker.patch.object(settings, "SESSION_FLUSH_INTERVAL", 0)
+    mocker.patch.object(tiered_store, "flush_idle", side_effect=asyncio.CancelledError)
+    with pytest.raises(asyncio.CancelledError):
+        await tiered_store.run_flush_loop()
+    assert tiered_store.cold_ready
+
+    await tiered_store.redis.delete(CONTEXT_KEY.format("s1"), LAST_SEEN_KEY)